@@ -1,10 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import anyio.to_thread
 
 from src.cores.config import settings
-from src.cores.database import create_db_and_tables
+from src.cores.database import create_db_and_tables, pool_stats, WORKER_THREADS
+from src.cores.pagination import NEXT_CURSOR_HEADER
 from src.cores.firebase_config import initialize_firebase
+from src.cores.storage import storage_service
 from src.controllers.auth_controller import router as auth_router
 from src.controllers.container_controller import router as container_router
 from src.controllers.slip_controller import router as slip_router
@@ -12,6 +16,8 @@ from src.controllers.media_controller import router as media_router
 from src.controllers.invite_controller import router as invite_router
 from src.controllers.comment_controller import router as comment_router
 from src.controllers.reaction_controller import router as reaction_router
+from src.services.invite_service import run_invite_sweeper
+from src.services.rendition_service import validate_rendition_settings
 
 
 @asynccontextmanager
@@ -19,6 +25,11 @@ async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     # Startup
     print("Starting up...")
+    # Blocking DB/S3 work runs in sync endpoints on a thread pool sized to the DB pool
+    anyio.to_thread.current_default_thread_limiter().total_tokens = WORKER_THREADS
+    print(f"Worker thread pool size: {WORKER_THREADS}")
+    if settings.MEDIA_RENDITIONS_ENABLED:
+        validate_rendition_settings()
     create_db_and_tables()
     print("Database tables created")
 
@@ -28,10 +39,22 @@ async def lifespan(app: FastAPI):
         print(f"Warning: Firebase initialization failed: {e}")
         print("Firebase authentication will not be available")
 
+    # Bucket check runs in the background so a slow MinIO can't hold up startup
+    storage_check = asyncio.create_task(anyio.to_thread.run_sync(storage_service.ensure_bucket))
+
+    # Expired invites are deactivated in the background, not on read
+    invite_sweeper = None
+    if settings.INVITE_SWEEP_INTERVAL > 0:
+        invite_sweeper = asyncio.create_task(run_invite_sweeper(settings.INVITE_SWEEP_INTERVAL))
+        print(f"Invite sweeper running every {settings.INVITE_SWEEP_INTERVAL}s")
+
     yield
 
     # Shutdown
     print("Shutting down...")
+    storage_check.cancel()
+    if invite_sweeper:
+        invite_sweeper.cancel()
 
 
 app = FastAPI(
@@ -48,6 +71,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -76,6 +100,17 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/db-pool")
+async def db_pool_health():
+    """
+    Connection pool telemetry for this worker
+
+    Each uvicorn worker has its own pool of up to size + max_overflow
+    connections; workers x that must stay below MySQL max_connections.
+    """
+    return pool_stats()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
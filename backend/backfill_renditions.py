@@ -0,0 +1,24 @@
+"""
+Rendition Backfill Job
+Generates resized WebP/JPEG renditions for images uploaded before the
+rendition pipeline existed, or whose background run failed
+(media.renditions is still NULL).
+
+    python backfill_renditions.py
+
+Safe to run while the API is serving traffic and to re-run; processed
+images are skipped.
+"""
+
+from src.services.rendition_service import backfill_renditions
+
+
+def run_backfill():
+    """Generate missing renditions for all images"""
+    print("🔄 Generating missing image renditions...")
+    processed = backfill_renditions()
+    print(f"✅ Renditions generated for {processed} images")
+
+
+if __name__ == "__main__":
+    run_backfill()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark repository counts: loading rows and calling len() vs SQL aggregates
+
+Seeds one slip with many reactions and comments in a temporary SQLite
+database, then prints the median latency and peak Python memory of each
+way to count them.
+
+    python bench_counts.py                  # 5000 reactions, 20 runs
+    python bench_counts.py 20000 10         # 20k reactions, 10 runs
+"""
+import sys
+sys.path.insert(0, '.')
+
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from sqlalchemy import insert
+from sqlmodel import SQLModel, Session, create_engine, select, func
+
+from src.models.user import User
+from src.models.container import Container
+from src.models.slip import Slip
+from src.models.comment import Comment
+from src.models.reaction import SlipReaction
+from src.repos.comment_repo import CommentRepository
+from src.repos.reaction_repo import ReactionRepository
+from src.repos.slip_repo import SlipRepository
+
+
+REACTION_TYPES = ["Heart", "Fire", "Resonate", "Laugh", "Sad"]
+
+
+def seed(engine, reactions: int) -> int:
+    """One slip with `reactions` reactions and as many comments, one user each; returns slip_id"""
+    with Session(engine) as session:
+        session.exec(insert(User), params=[
+            {"username": f"bench{i}", "email": f"bench{i}@example.com", "firebase_uid": f"bench{i}"}
+            for i in range(reactions)
+        ])
+        owner_id = session.exec(select(func.min(User.user_id))).one()
+        container = Container(name="bench", owner_id=owner_id, member_count=1)
+        session.add(container)
+        session.flush()
+        slip = Slip(container_id=container.container_id, author_id=owner_id, text_content="bench")
+        session.add(slip)
+        session.flush()
+        user_ids = session.exec(select(User.user_id)).all()
+        session.exec(insert(SlipReaction), params=[
+            {"slip_id": slip.slip_id, "user_id": user_id, "reaction_type": REACTION_TYPES[i % len(REACTION_TYPES)]}
+            for i, user_id in enumerate(user_ids)
+        ])
+        session.exec(insert(Comment), params=[
+            {"slip_id": slip.slip_id, "author_id": user_id, "text_content": "bench"}
+            for user_id in user_ids
+        ])
+        session.commit()
+        slip_id = slip.slip_id
+
+    # Fill the denormalised counters the summaries read
+    with Session(engine) as session:
+        SlipRepository(session).reconcile_counters([slip_id])
+    return slip_id
+
+
+def measure(engine, runs: int, fn) -> dict:
+    """Median latency (ms) and peak traced memory (KiB) of fn(session) over `runs` fresh sessions"""
+    latencies, peaks, result = [], [], None
+    for _ in range(runs):
+        with Session(engine) as session:
+            tracemalloc.start()
+            start = time.perf_counter()
+            result = fn(session)
+            latencies.append((time.perf_counter() - start) * 1000)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+    return {"result": result, "ms": statistics.median(latencies), "peak_kib": max(peaks)}
+
+
+def python_summary(session: Session, slip_id: int) -> dict:
+    """The old approach: load every reaction and group in Python"""
+    summary = {}
+    for reaction in session.exec(select(SlipReaction).where(SlipReaction.slip_id == slip_id)).all():
+        summary[reaction.reaction_type] = summary.get(reaction.reaction_type, 0) + 1
+    return summary
+
+
+def group_by_summary(session: Session, slip_id: int) -> dict:
+    """SELECT reaction_type, COUNT(*) ... GROUP BY reaction_type"""
+    statement = (
+        select(SlipReaction.reaction_type, func.count())
+        .where(SlipReaction.slip_id == slip_id)
+        .group_by(SlipReaction.reaction_type)
+    )
+    return dict(session.exec(statement).all())
+
+
+if __name__ == "__main__":
+    reactions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    print("="*60)
+    print(f"Repository Count Benchmark ({reactions} reactions and comments, {runs} runs)")
+    print("="*60)
+
+    tmp = tempfile.mkdtemp()
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+    SQLModel.metadata.create_all(engine)
+    slip_id = seed(engine, reactions)
+
+    cases = [
+        ("reactions: len(rows)", lambda s: len(s.exec(select(SlipReaction).where(SlipReaction.slip_id == slip_id)).all())),
+        ("reactions: COUNT(*)", lambda s: ReactionRepository(s).count_by_slip(slip_id)),
+        ("comments: len(rows)", lambda s: len(s.exec(select(Comment).where(Comment.slip_id == slip_id)).all())),
+        ("comments: COUNT(*)", lambda s: CommentRepository(s).count_by_slip(slip_id)),
+        ("summary: python grouping", lambda s: python_summary(s, slip_id)),
+        ("summary: GROUP BY", lambda s: group_by_summary(s, slip_id)),
+        ("summary: slipreactioncount", lambda s: ReactionRepository(s).get_reaction_summary(slip_id)),
+    ]
+
+    print()
+    results = {}
+    for label, fn in cases:
+        stats = measure(engine, runs, fn)
+        results[label] = stats["result"]
+        print(f"   {label:<28} {stats['ms']:8.2f} ms   peak {stats['peak_kib']:8.0f} KiB")
+
+    # Every pair must agree on the answer
+    consistent = (
+        results["reactions: len(rows)"] == results["reactions: COUNT(*)"] == reactions
+        and results["comments: len(rows)"] == results["comments: COUNT(*)"] == reactions
+        and results["summary: python grouping"] == results["summary: GROUP BY"] == results["summary: slipreactioncount"]
+    )
+    print(f"\n   {'✅' if consistent else '❌'} All methods return the same counts")
+    if not consistent:
+        sys.exit(1)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark invite creation against the configured database
+
+One admin creates many invites through InviteService.create_invite; prints
+per-invite latency percentiles and SQL statements issued per invite.
+
+    python bench_invite_codes.py                # 100k invites
+    python bench_invite_codes.py 10000          # 10k invites
+"""
+import sys
+sys.path.insert(0, '.')
+
+import secrets
+import statistics
+import time
+from sqlalchemy import event
+from sqlmodel import Session, delete
+
+from src.cores.database import engine
+from src.models.user import User
+from src.models.container import Container
+from src.models.membership import Membership
+from src.models.invite import Invite, InviteCreate
+from src.repos.invite_repo import InviteRepository
+from src.repos.membership_repo import MembershipRepository
+from src.repos.container_repo import ContainerRepository
+from src.services.invite_service import InviteService
+
+
+def run_benchmark(engine, invites: int = 100_000) -> dict:
+    """Create `invites` invites one by one; return latency (ms) and statement stats"""
+    tag = secrets.token_hex(4)
+
+    # Setup: admin and container
+    with Session(engine) as session:
+        owner = User(username=f"bench_{tag}", email=f"bench_{tag}@example.com", firebase_uid=f"bench_{tag}")
+        session.add(owner)
+        session.flush()
+        container = Container(name=f"bench_{tag}", owner_id=owner.user_id, member_count=1)
+        session.add(container)
+        session.flush()
+        session.add(Membership(user_id=owner.user_id, container_id=container.container_id, role="admin"))
+        session.commit()
+        owner_id, container_id = owner.user_id, container.container_id
+
+    statements = 0
+
+    def count_statement(*args):
+        nonlocal statements
+        statements += 1
+
+    # Measure: one session like a request would have, one commit per invite
+    latencies = []
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        with Session(engine) as session:
+            service = InviteService(
+                InviteRepository(session),
+                MembershipRepository(session),
+                ContainerRepository(session)
+            )
+            invite_data = InviteCreate(container_id=container_id)
+            for i in range(invites):
+                start = time.perf_counter()
+                service.create_invite(invite_data, owner_id)
+                latencies.append((time.perf_counter() - start) * 1000)
+                # Keep the identity map from growing across the whole run
+                session.expunge_all()
+                if (i + 1) % 10_000 == 0:
+                    print(f"   {i + 1} invites...")
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    # Cleanup
+    with Session(engine) as session:
+        session.exec(delete(Invite).where(Invite.container_id == container_id))
+        session.exec(delete(Membership).where(Membership.container_id == container_id))
+        session.exec(delete(Container).where(Container.container_id == container_id))
+        session.exec(delete(User).where(User.user_id == owner_id))
+        session.commit()
+
+    latencies.sort()
+    return {
+        "invites": invites,
+        "total_s": sum(latencies) / 1000,
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+        "p99_ms": latencies[int(len(latencies) * 0.99)],
+        "max_ms": latencies[-1],
+        "statements_per_invite": statements / invites,
+    }
+
+
+if __name__ == "__main__":
+    invites = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print("="*60)
+    print(f"Invite Code Generation Benchmark ({invites} invites)")
+    print("="*60)
+
+    stats = run_benchmark(engine, invites)
+    print(f"\n   Total: {stats['total_s']:.1f} s")
+    print(f"   Per invite: mean {stats['mean_ms']:.3f} ms, p50 {stats['p50_ms']:.3f} ms, "
+          f"p95 {stats['p95_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms, max {stats['max_ms']:.3f} ms")
+    print(f"   Statements per invite: {stats['statements_per_invite']:.2f}")
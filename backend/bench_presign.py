@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark presigned URL generation: boto3 vs the offline SigV4 presigner
+
+Signs many distinct keys with each and prints the per-URL cost. Both sign
+offline; no storage server is needed.
+
+    python bench_presign.py                 # 20k URLs each
+    python bench_presign.py 100000          # 100k URLs each
+"""
+import sys
+sys.path.insert(0, '.')
+
+import time
+import uuid
+import boto3
+from botocore.client import Config
+
+from src.cores.storage import SigV4Presigner
+
+
+ENDPOINT = "192.168.0.101:9000"
+ACCESS_KEY = "admin"
+SECRET_KEY = "strongpassword123"
+REGION = "us-east-1"
+BUCKET = "jar-talk"
+
+
+def per_url_us(sign, keys) -> float:
+    """Mean microseconds per call of sign(key)"""
+    start = time.perf_counter()
+    for key in keys:
+        sign(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def run_benchmark(urls: int = 20_000) -> dict:
+    """Per-URL cost (us) of GET and PUT presigning with boto3 and SigV4Presigner"""
+    keys = [f"image/{uuid.uuid4()}.jpg" for _ in range(urls)]
+    client = boto3.client(
+        "s3",
+        endpoint_url=f"http://{ENDPOINT}",
+        aws_access_key_id=ACCESS_KEY,
+        aws_secret_access_key=SECRET_KEY,
+        region_name=REGION,
+        config=Config(signature_version="s3v4")
+    )
+    presigner = SigV4Presigner(ENDPOINT, ACCESS_KEY, SECRET_KEY, REGION)
+
+    return {
+        "boto3_get_us": per_url_us(
+            lambda key: client.generate_presigned_url("get_object", Params={"Bucket": BUCKET, "Key": key}, ExpiresIn=3600),
+            keys
+        ),
+        "sigv4_get_us": per_url_us(lambda key: presigner.presign("GET", BUCKET, key, 3600), keys),
+        "boto3_put_us": per_url_us(
+            lambda key: client.generate_presigned_url(
+                "put_object", Params={"Bucket": BUCKET, "Key": key, "ContentType": "image/jpeg"}, ExpiresIn=3600
+            ),
+            keys
+        ),
+        "sigv4_put_us": per_url_us(lambda key: presigner.presign("PUT", BUCKET, key, 3600, content_type="image/jpeg"), keys),
+    }
+
+
+if __name__ == "__main__":
+    urls = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    print("="*60)
+    print(f"Presign Benchmark ({urls} URLs each)")
+    print("="*60)
+
+    stats = run_benchmark(urls)
+    for method in ("get", "put"):
+        boto3_us, sigv4_us = stats[f"boto3_{method}_us"], stats[f"sigv4_{method}_us"]
+        print(f"   {method.upper():<4} boto3 {boto3_us:8.1f} us/URL   SigV4Presigner {sigv4_us:6.1f} us/URL   "
+              f"({boto3_us / sigv4_us:.0f}x)")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark application import time in fresh interpreters
+
+Imports each module in a new Python process (so nothing is cached) and
+prints the median wall time. Importing must not touch the network, so the
+numbers should not depend on whether STORAGE_ENDPOINT is reachable.
+
+    python bench_startup.py                 # 5 runs per module
+    python bench_startup.py 10              # 10 runs per module
+"""
+import sys
+sys.path.insert(0, '.')
+
+import statistics
+import subprocess
+
+
+MODULES = [
+    "src.cores.storage",
+    "src.services.media_service",
+    "src.services.slip_service",
+    "app",
+]
+
+# Child process: time the import, then the first S3 client construction
+PROBE = """
+import sys, time
+sys.path.insert(0, '.')
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+from src.cores.storage import storage_service
+storage_service.s3_client
+print(imported - start, time.perf_counter() - imported)
+"""
+
+
+def time_import(module: str, runs: int) -> dict:
+    """Median import and first-client times (ms) for `module` over `runs` fresh processes"""
+    imports, clients = [], []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            capture_output=True,
+            text=True,
+            timeout=300
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+        imported, client = map(float, result.stdout.split()[-2:])
+        imports.append(imported * 1000)
+        clients.append(client * 1000)
+    return {
+        "import_ms": statistics.median(imports),
+        "import_max_ms": max(imports),
+        "first_client_ms": statistics.median(clients),
+    }
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("="*60)
+    print(f"Startup Import Benchmark ({runs} runs per module)")
+    print("="*60)
+
+    for module in MODULES:
+        stats = time_import(module, runs)
+        print(f"   {module:<30} import {stats['import_ms']:8.1f} ms (max {stats['import_max_ms']:.1f}), "
+              f"first S3 client {stats['first_client_ms']:.1f} ms")
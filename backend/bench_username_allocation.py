@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark username allocation at signup against the configured database
+
+Seeds many colliding usernames (alice, alice1, ..., alice<N-1>), then signs
+up new users with the same email prefix and prints per-signup latency and
+SQL statements issued per signup.
+
+    python bench_username_allocation.py                 # 10k seeded, 100 signups
+    python bench_username_allocation.py 50000 20        # 50k seeded, 20 signups
+"""
+import sys
+sys.path.insert(0, '.')
+
+import secrets
+import statistics
+import time
+from sqlalchemy import event, insert
+from sqlmodel import Session, delete
+
+from src.cores.database import engine
+from src.models.user import User
+from src.services.auth_service import AuthService
+
+
+def run_benchmark(engine, seeded: int = 10_000, signups: int = 100) -> dict:
+    """Seed `seeded` colliding usernames, time `signups` signups; return latency (ms) and statement stats"""
+    tag = secrets.token_hex(4)
+    base = f"bench{tag}"
+
+    # Setup: base, base1, ..., base<seeded-1>
+    with Session(engine) as session:
+        session.exec(insert(User), params=[
+            {
+                "username": base if i == 0 else f"{base}{i}",
+                "email": f"seed_{tag}_{i}@example.com",
+                "firebase_uid": f"seed_{tag}_{i}",
+            }
+            for i in range(seeded)
+        ])
+        session.commit()
+
+    statements = 0
+
+    def count_statement(*args):
+        nonlocal statements
+        statements += 1
+
+    # Measure: each signup is a fresh request with its own session
+    latencies, usernames = [], []
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        for i in range(signups):
+            with Session(engine) as session:
+                service = AuthService(session)
+                start = time.perf_counter()
+                user = service._create_with_generated_username(
+                    email=f"{base}@signup{i}.example.com",
+                    firebase_uid=f"signup_{tag}_{i}",
+                    photo_url=None
+                )
+                latencies.append((time.perf_counter() - start) * 1000)
+                usernames.append(user.username)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    # Cleanup
+    with Session(engine) as session:
+        session.exec(delete(User).where(User.username.like(f"{base}%")))
+        session.commit()
+
+    latencies.sort()
+    return {
+        "seeded": seeded,
+        "signups": signups,
+        "first_username": usernames[0],
+        "last_username": usernames[-1],
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+        "max_ms": latencies[-1],
+        "statements_per_signup": statements / signups,
+    }
+
+
+if __name__ == "__main__":
+    seeded = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    signups = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    print("="*60)
+    print(f"Username Allocation Benchmark ({seeded} seeded, {signups} signups)")
+    print("="*60)
+
+    stats = run_benchmark(engine, seeded, signups)
+    print(f"\n   Usernames: {stats['first_username']} ... {stats['last_username']}")
+    print(f"   Per signup: mean {stats['mean_ms']:.3f} ms, p50 {stats['p50_ms']:.3f} ms, "
+          f"p95 {stats['p95_ms']:.3f} ms, max {stats['max_ms']:.3f} ms")
+    print(f"   Statements per signup: {stats['statements_per_signup']:.2f}")
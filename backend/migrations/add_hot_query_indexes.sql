@@ -0,0 +1,38 @@
+-- Migration: Add composite indexes for hot query shapes
+-- Date: 2026-10-17
+
+-- Slips in a container / by an author, newest first (offset and keyset pagination)
+CREATE INDEX idx_slip_container_created ON slip (container_id, created_at, slip_id);
+CREATE INDEX idx_slip_author_created ON slip (author_id, created_at, slip_id);
+
+-- Comments on a slip, oldest first
+CREATE INDEX idx_comment_slip_created ON comment (slip_id, created_at, comment_id);
+
+-- Media of a slip in upload order
+CREATE INDEX idx_media_slip_created ON media (slip_id, created_at, media_id);
+
+-- Membership/role checks for a (user, container) pair (covering)
+CREATE INDEX idx_membership_user_container ON membership (user_id, container_id, role);
+
+-- Reactions on a slip, newest first
+CREATE INDEX idx_slipreaction_slip_created ON slipreaction (slip_id, created_at, slip_reaction_id);
+-- Per-type counts of a slip, recounted by reconcile_counters (by slip_id, reaction_type)
+CREATE INDEX idx_slipreaction_slip_type ON slipreaction (slip_id, reaction_type, created_at);
+
+-- One reaction per user per slip (tables created by SQLModel lack it).
+-- Keep the newest reaction when duplicates exist.
+DELETE older FROM slipreaction older
+JOIN slipreaction newer
+  ON older.slip_id = newer.slip_id
+ AND older.user_id = newer.user_id
+ AND older.slip_reaction_id < newer.slip_reaction_id;
+
+ALTER TABLE slipreaction
+ADD UNIQUE KEY unique_user_slip_reaction (slip_id, user_id);
+
+-- Verify the indexes
+SHOW INDEX FROM slip;
+SHOW INDEX FROM comment;
+SHOW INDEX FROM media;
+SHOW INDEX FROM membership;
+SHOW INDEX FROM slipreaction;
@@ -0,0 +1,10 @@
+-- Migration: Add renditions (resized image copies) to media
+-- Date: 2026-10-17
+
+-- JSON list of {width, height, format, key}; NULL until generated.
+-- Existing images: run `python backfill_renditions.py` afterwards.
+ALTER TABLE media
+ADD COLUMN renditions TEXT NULL;
+
+-- Verify the change
+DESCRIBE media;
@@ -0,0 +1,16 @@
+-- Migration: Add denormalised member_count column to container table
+-- Date: 2026-10-17
+
+ALTER TABLE container
+ADD COLUMN member_count INT NOT NULL DEFAULT 0;
+
+-- Backfill from existing memberships
+UPDATE container c
+SET member_count = (
+    SELECT COUNT(*)
+    FROM membership m
+    WHERE m.container_id = c.container_id
+);
+
+-- Verify the change
+DESCRIBE container;
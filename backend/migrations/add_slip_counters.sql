@@ -0,0 +1,29 @@
+-- Migration: Add denormalised comment/reaction counters for slips
+-- Date: 2026-10-17
+
+ALTER TABLE slip
+ADD COLUMN comment_count INT NOT NULL DEFAULT 0,
+ADD COLUMN reaction_count INT NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS slipreactioncount (
+    slip_id INT NOT NULL,
+    reaction_type VARCHAR(50) NOT NULL,
+    count INT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (slip_id, reaction_type),
+    FOREIGN KEY (slip_id) REFERENCES slip(slip_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Backfill from existing comments and reactions
+UPDATE slip s
+SET comment_count = (SELECT COUNT(*) FROM comment c WHERE c.slip_id = s.slip_id),
+    reaction_count = (SELECT COUNT(*) FROM slipreaction r WHERE r.slip_id = s.slip_id);
+
+INSERT INTO slipreactioncount (slip_id, reaction_type, count)
+SELECT slip_id, reaction_type, COUNT(*)
+FROM slipreaction
+GROUP BY slip_id, reaction_type;
+
+-- Verify the change
+DESCRIBE slip;
+DESCRIBE slipreactioncount;
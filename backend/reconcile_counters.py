@@ -0,0 +1,34 @@
+"""
+Counter Reconciliation Job
+Rebuilds the denormalised per-slip counters (slip.comment_count,
+slip.reaction_count, slipreactioncount) from the comment and slipreaction
+tables. Counters drift when rows are removed outside the repositories,
+e.g. by ON DELETE CASCADE when a user is deleted.
+
+    python reconcile_counters.py                # all slips
+    python reconcile_counters.py 12 34 56       # only these slip IDs
+
+Slips are processed in batches of RECONCILE_BATCH_SIZE, each committed on
+its own, and only counters that differ are written, so toggles and comments
+on other slips are never blocked for longer than one batch. Safe to run
+while the API is serving traffic; schedule it (e.g. nightly cron).
+"""
+
+import sys
+from sqlmodel import Session
+from src.cores.database import engine
+from src.repos.slip_repo import SlipRepository
+
+
+def reconcile_counters():
+    """Rebuild slip counters, optionally for the slip IDs given on the command line"""
+    slip_ids = [int(arg) for arg in sys.argv[1:]] or None
+
+    print("🔄 Reconciling slip counters...")
+    with Session(engine) as session:
+        drifted = SlipRepository(session).reconcile_counters(slip_ids)
+    print(f"✅ Counters rebuilt ({drifted} slips had drifted totals)")
+
+
+if __name__ == "__main__":
+    reconcile_counters()
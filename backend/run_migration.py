@@ -1,8 +1,12 @@
 """
 Database Migration Script
 Run this to apply pending migrations
+
+    python run_migration.py            # apply pending migrations
+    python run_migration.py --explain  # print EXPLAIN plans of hot repository queries
 """
 
+import sys
 import pymysql
 from src.cores.config import settings
 
@@ -149,6 +153,281 @@ def create_comment_and_reaction_tables(cursor, db_name):
         print("   ✅ Created table: slipreaction")
 
 
+# (table, index name, columns, unique) - created by Migration 4
+HOT_QUERY_INDEXES = [
+    ("slip", "idx_slip_container_created", "container_id, created_at, slip_id", False),
+    ("slip", "idx_slip_author_created", "author_id, created_at, slip_id", False),
+    ("comment", "idx_comment_slip_created", "slip_id, created_at, comment_id", False),
+    ("media", "idx_media_slip_created", "slip_id, created_at, media_id", False),
+    ("membership", "idx_membership_user_container", "user_id, container_id, role", False),
+    ("slipreaction", "idx_slipreaction_slip_created", "slip_id, created_at, slip_reaction_id", False),
+    # Per-type counts in SlipRepository.reconcile_counters; feeds read slipreactioncount
+    ("slipreaction", "idx_slipreaction_slip_type", "slip_id, reaction_type, created_at", False),
+    ("slipreaction", "unique_user_slip_reaction", "slip_id, user_id", True),
+]
+
+
+def index_exists(cursor, db_name, table, index_name):
+    """Check if an index exists on a table"""
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = %s
+        AND TABLE_NAME = %s
+        AND INDEX_NAME = %s
+    """, (db_name, table, index_name))
+    return cursor.fetchone()[0] > 0
+
+
+def add_hot_query_indexes(cursor, db_name):
+    """Migration 4: Add composite indexes for hot query shapes"""
+    print("🔄 Migration 4: Add composite indexes for hot query shapes...")
+
+    for table, index_name, columns, unique in HOT_QUERY_INDEXES:
+        if index_exists(cursor, db_name, table, index_name):
+            print(f"   ✅ Index '{table}.{index_name}' already exists. Skipping.")
+            continue
+
+        if unique:
+            # Keep the newest reaction when a user reacted to a slip more than once
+            cursor.execute("""
+                DELETE older FROM slipreaction older
+                JOIN slipreaction newer
+                  ON older.slip_id = newer.slip_id
+                 AND older.user_id = newer.user_id
+                 AND older.slip_reaction_id < newer.slip_reaction_id
+            """)
+            if cursor.rowcount:
+                print(f"   🧹 Removed {cursor.rowcount} duplicate reactions")
+            cursor.execute(f"ALTER TABLE {table} ADD UNIQUE KEY {index_name} ({columns})")
+        else:
+            cursor.execute(f"CREATE INDEX {index_name} ON {table} ({columns})")
+
+        print(f"   ✅ Added index: {table}.{index_name} ({columns})")
+
+
+def add_member_count_to_container(cursor, db_name):
+    """Migration 5: Add denormalised member_count column to container table"""
+    print("🔄 Migration 5: Add member_count column to container table...")
+
+    # Check if column already exists
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = %s
+        AND TABLE_NAME = 'container'
+        AND COLUMN_NAME = 'member_count'
+    """, (db_name,))
+
+    result = cursor.fetchone()
+
+    if result[0] > 0:
+        print("   ✅ Column 'member_count' already exists. Skipping.")
+        return
+
+    # Add the column and backfill it from memberships
+    cursor.execute("""
+        ALTER TABLE container
+        ADD COLUMN member_count INT NOT NULL DEFAULT 0
+    """)
+    cursor.execute("""
+        UPDATE container c
+        SET member_count = (
+            SELECT COUNT(*)
+            FROM membership m
+            WHERE m.container_id = c.container_id
+        )
+    """)
+
+    print("   ✅ Added column: container.member_count (INT NOT NULL DEFAULT 0), backfilled")
+
+
+def add_slip_counters(cursor, db_name):
+    """Migration 6: Add denormalised comment/reaction counters for slips"""
+    print("🔄 Migration 6: Add slip counter columns and slipreactioncount table...")
+
+    # Check if columns already exist
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = %s
+        AND TABLE_NAME = 'slip'
+        AND COLUMN_NAME = 'comment_count'
+    """, (db_name,))
+
+    result = cursor.fetchone()
+
+    if result[0] > 0:
+        print("   ✅ Column 'comment_count' already exists. Skipping.")
+    else:
+        # Add the columns and backfill them
+        cursor.execute("""
+            ALTER TABLE slip
+            ADD COLUMN comment_count INT NOT NULL DEFAULT 0,
+            ADD COLUMN reaction_count INT NOT NULL DEFAULT 0
+        """)
+        cursor.execute("""
+            UPDATE slip s
+            SET comment_count = (SELECT COUNT(*) FROM comment c WHERE c.slip_id = s.slip_id),
+                reaction_count = (SELECT COUNT(*) FROM slipreaction r WHERE r.slip_id = s.slip_id)
+        """)
+        print("   ✅ Added columns: slip.comment_count, slip.reaction_count, backfilled")
+
+    # Check if slipreactioncount table already exists
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = %s
+        AND TABLE_NAME = 'slipreactioncount'
+    """, (db_name,))
+
+    result = cursor.fetchone()
+
+    if result[0] > 0:
+        print("   ✅ Table 'slipreactioncount' already exists. Skipping.")
+        return
+
+    # Create the table and backfill it
+    cursor.execute("""
+        CREATE TABLE slipreactioncount (
+            slip_id INT NOT NULL,
+            reaction_type VARCHAR(50) NOT NULL,
+            count INT NOT NULL DEFAULT 0,
+
+            PRIMARY KEY (slip_id, reaction_type),
+            FOREIGN KEY (slip_id) REFERENCES slip(slip_id) ON DELETE CASCADE
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+    cursor.execute("""
+        INSERT INTO slipreactioncount (slip_id, reaction_type, count)
+        SELECT slip_id, reaction_type, COUNT(*)
+        FROM slipreaction
+        GROUP BY slip_id, reaction_type
+    """)
+
+    print("   ✅ Created table: slipreactioncount, backfilled")
+
+
+def add_media_renditions(cursor, db_name):
+    """Migration 7: Add renditions column to media table"""
+    print("🔄 Migration 7: Add renditions column to media table...")
+
+    # Check if column already exists
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = %s
+        AND TABLE_NAME = 'media'
+        AND COLUMN_NAME = 'renditions'
+    """, (db_name,))
+
+    result = cursor.fetchone()
+
+    if result[0] > 0:
+        print("   ✅ Column 'renditions' already exists. Skipping.")
+        return
+
+    # NULL until the rendition pipeline runs; backfill with backfill_renditions.py
+    cursor.execute("""
+        ALTER TABLE media
+        ADD COLUMN renditions TEXT NULL
+    """)
+
+    print("   ✅ Added column: media.renditions (TEXT NULL); run backfill_renditions.py for existing images")
+
+
+def explain_hot_queries(cursor):
+    """Print EXPLAIN plans for the query shapes used by the repositories"""
+    # Pick the busiest keys so plans reflect the seeded dataset
+    cursor.execute("SELECT container_id FROM slip GROUP BY container_id ORDER BY COUNT(*) DESC LIMIT 1")
+    row = cursor.fetchone()
+    container_id = row[0] if row else 0
+    cursor.execute("SELECT author_id FROM slip GROUP BY author_id ORDER BY COUNT(*) DESC LIMIT 1")
+    row = cursor.fetchone()
+    author_id = row[0] if row else 0
+    cursor.execute("SELECT slip_id FROM slipreaction GROUP BY slip_id ORDER BY COUNT(*) DESC LIMIT 1")
+    row = cursor.fetchone()
+    slip_id = row[0] if row else 0
+    cursor.execute("SELECT user_id FROM membership GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1")
+    row = cursor.fetchone()
+    user_id = row[0] if row else 0
+    cursor.execute(
+        "SELECT slip_id FROM slip WHERE container_id = %s ORDER BY created_at DESC, slip_id DESC LIMIT 50",
+        (container_id,)
+    )
+    page_ids = [r[0] for r in cursor.fetchall()] or [0]
+    page = ", ".join(str(int(i)) for i in page_ids)
+
+    queries = [
+        ("SlipRepository.get_by_container (offset)",
+         f"SELECT * FROM slip WHERE container_id = {container_id} "
+         "ORDER BY created_at DESC, slip_id DESC LIMIT 50 OFFSET 1000"),
+        ("SlipRepository.get_by_container (cursor)",
+         f"SELECT * FROM slip WHERE container_id = {container_id} "
+         "AND (created_at < NOW() OR (created_at = NOW() AND slip_id < 1000000)) "
+         "ORDER BY created_at DESC, slip_id DESC LIMIT 50"),
+        ("SlipRepository.get_by_author",
+         f"SELECT * FROM slip WHERE author_id = {author_id} "
+         "ORDER BY created_at DESC, slip_id DESC LIMIT 50"),
+        ("CommentRepository.get_by_slip",
+         f"SELECT * FROM comment WHERE slip_id = {slip_id} "
+         "ORDER BY created_at, comment_id LIMIT 100"),
+        ("CommentRepository.get_first_by_slips",
+         "SELECT c.* FROM comment c JOIN ("
+         "SELECT comment_id, ROW_NUMBER() OVER (PARTITION BY slip_id ORDER BY created_at, comment_id) AS rn "
+         f"FROM comment WHERE slip_id IN ({page})) ranked "
+         "ON c.comment_id = ranked.comment_id WHERE ranked.rn <= 3"),
+        ("CommentRepository.count_by_slips",
+         f"SELECT slip_id, COUNT(*) FROM comment WHERE slip_id IN ({page}) GROUP BY slip_id"),
+        ("MediaRepository.get_by_slips",
+         f"SELECT * FROM media WHERE slip_id IN ({page}) ORDER BY slip_id, created_at, media_id"),
+        ("ReactionRepository.get_reaction_summaries",
+         f"SELECT * FROM slipreactioncount WHERE slip_id IN ({page}) AND count > 0 "
+         "ORDER BY slip_id, count DESC, reaction_type"),
+        ("SlipRepository.reconcile_counters (per-type counts)",
+         "SELECT slip_id, reaction_type, COUNT(*) FROM slipreaction "
+         f"WHERE slip_id IN ({page}) GROUP BY slip_id, reaction_type"),
+        ("ReactionRepository.get_by_slip",
+         f"SELECT * FROM slipreaction WHERE slip_id = {slip_id} "
+         "ORDER BY created_at DESC, slip_reaction_id DESC"),
+        ("ReactionRepository.get_user_reaction",
+         f"SELECT * FROM slipreaction WHERE slip_id = {slip_id} AND user_id = {user_id}"),
+        ("MembershipRepository.get_user_membership",
+         f"SELECT * FROM membership WHERE user_id = {user_id} AND container_id = {container_id}"),
+        ("MembershipRepository.get_user_containers",
+         f"SELECT * FROM membership WHERE user_id = {user_id}"),
+    ]
+
+    for name, sql in queries:
+        print(f"\n📊 {name}")
+        cursor.execute(f"EXPLAIN {sql}")
+        columns = [c[0] for c in cursor.description]
+        for plan in cursor.fetchall():
+            plan = dict(zip(columns, plan))
+            print(
+                f"   table={plan.get('table')} type={plan.get('type')} "
+                f"key={plan.get('key')} rows={plan.get('rows')} extra={plan.get('Extra')}"
+            )
+
+
+def run_explain():
+    """Print EXPLAIN plans of the hot repository queries"""
+
+    connection = pymysql.connect(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        database=settings.DB_NAME
+    )
+
+    try:
+        with connection.cursor() as cursor:
+            explain_hot_queries(cursor)
+    finally:
+        connection.close()
+
+
 def run_migration():
     """Run all pending migrations"""
 
@@ -170,6 +449,10 @@ def run_migration():
             add_title_to_slip(cursor, settings.DB_NAME)
             create_invite_table(cursor, settings.DB_NAME)
             create_comment_and_reaction_tables(cursor, settings.DB_NAME)
+            add_hot_query_indexes(cursor, settings.DB_NAME)
+            add_member_count_to_container(cursor, settings.DB_NAME)
+            add_slip_counters(cursor, settings.DB_NAME)
+            add_media_renditions(cursor, settings.DB_NAME)
 
             connection.commit()
 
@@ -187,4 +470,7 @@ def run_migration():
 
 
 if __name__ == "__main__":
-    run_migration()
+    if "--explain" in sys.argv:
+        run_explain()
+    else:
+        run_migration()
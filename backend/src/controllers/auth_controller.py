@@ -3,7 +3,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel import Session
 from typing import Optional
 
-from ..cores.database import get_session
+from ..cores.database import get_session, get_primary_session
 from ..cores.security import get_current_user_id, security
 from ..models.user import (
     UserResponse,
@@ -17,7 +17,7 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/firebase", response_model=AuthResponse)
-async def firebase_auth(
+def firebase_auth(
     firebase_data: FirebaseAuthRequest,
     username: Optional[str] = None,
     session: Session = Depends(get_session)
@@ -54,15 +54,17 @@ async def firebase_auth(
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(
+def get_current_user(
     user_id: int = Depends(get_current_user_id),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_primary_session)
 ):
     """
     Get current authenticated user information
 
     Requires: Authorization header with Bearer token
     """
+    # Primary: the signup that created the user carried no bearer token, so
+    # nothing pinned this user to it and a replica may not have the row yet
     auth_service = AuthService(session)
     return auth_service.get_current_user(user_id)
 
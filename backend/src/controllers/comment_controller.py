@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlmodel import Session
-from typing import List
+from typing import List, Optional
 
 from ..cores.database import get_session
 from ..cores.security import get_current_user_id
+from ..cores.pagination import NEXT_CURSOR_HEADER, next_cursor
 from ..repos.comment_repo import CommentRepository
 from ..repos.slip_repo import SlipRepository
 from ..repos.membership_repo import MembershipRepository
@@ -41,8 +42,10 @@ def create_comment(
 @router.get("/slip/{slip_id}", response_model=List[CommentResponse])
 def get_slip_comments(
     slip_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     user_id: int = Depends(get_current_user_id),
     comment_service: CommentService = Depends(get_comment_service)
 ):
@@ -54,8 +57,13 @@ def get_slip_comments(
     **Query Parameters:**
     - skip: Pagination offset (default: 0)
     - limit: Number of comments to return (default: 100)
+    - cursor: Keyset cursor from the X-Next-Cursor header (overrides skip)
     """
-    return comment_service.get_slip_comments(slip_id, user_id, skip, limit)
+    comments = comment_service.get_slip_comments(slip_id, user_id, skip, limit, cursor)
+    cursor_value = next_cursor(comments, "comment_id", limit)
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
+    return comments
 
 
 @router.get("/{comment_id}", response_model=CommentResponse)
@@ -12,7 +12,7 @@ router = APIRouter(prefix="/containers", tags=["Containers"])
 
 
 @router.post("", response_model=ContainerResponse, status_code=status.HTTP_201_CREATED)
-async def create_container(
+def create_container(
     container_data: ContainerCreate,
     user_id: int = Depends(get_current_user_id),
     session: Session = Depends(get_session)
@@ -28,7 +28,7 @@ async def create_container(
 
 
 @router.get("", response_model=List[ContainerResponse])
-async def get_user_containers(
+def get_user_containers(
     user_id: int = Depends(get_current_user_id),
     session: Session = Depends(get_session)
 ):
@@ -42,7 +42,7 @@ async def get_user_containers(
 
 
 @router.get("/{container_id}", response_model=ContainerDetailResponse)
-async def get_container(
+def get_container(
     container_id: int,
     user_id: int = Depends(get_current_user_id),
     session: Session = Depends(get_session)
@@ -57,7 +57,7 @@ async def get_container(
 
 
 @router.put("/{container_id}", response_model=ContainerResponse)
-async def update_container(
+def update_container(
     container_id: int,
     container_data: ContainerUpdate,
     user_id: int = Depends(get_current_user_id),
@@ -73,7 +73,7 @@ async def update_container(
 
 
 @router.delete("/{container_id}")
-async def delete_container(
+def delete_container(
     container_id: int,
     user_id: int = Depends(get_current_user_id),
     session: Session = Depends(get_session)
@@ -89,7 +89,7 @@ async def delete_container(
 
 
 @router.post("/{container_id}/members")
-async def add_member(
+def add_member(
     container_id: int,
     member_user_id: int = Query(..., description="User ID to add as member"),
     role: str = Query("member", description="Role: 'admin' or 'member'"),
@@ -106,7 +106,7 @@ async def add_member(
 
 
 @router.delete("/{container_id}/members/{member_user_id}")
-async def remove_member(
+def remove_member(
     container_id: int,
     member_user_id: int,
     user_id: int = Depends(get_current_user_id),
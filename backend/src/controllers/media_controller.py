@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlmodel import Session
 from typing import List
 
+from ..cores.config import settings
 from ..cores.database import get_session
 from ..cores.security import get_current_user_id
 from ..models.media import (
@@ -12,13 +13,14 @@ from ..models.media import (
     UploadUrlResponse
 )
 from ..services.media_service import MediaService
+from ..services.rendition_service import generate_renditions
 
 
 router = APIRouter(prefix="/media", tags=["Media"])
 
 
 @router.post("/upload-url", response_model=UploadUrlResponse)
-async def request_upload_url(
+def request_upload_url(
     upload_request: UploadUrlRequest,
     user_id: int = Depends(get_current_user_id),
     session: Session = Depends(get_session)
@@ -58,8 +60,9 @@ async def request_upload_url(
 
 
 @router.post("", response_model=MediaResponse, status_code=status.HTTP_201_CREATED)
-async def create_media(
+def create_media(
     media_data: MediaCreate,
+    background_tasks: BackgroundTasks,
     user_id: int = Depends(get_current_user_id),
     session: Session = Depends(get_session)
 ):
@@ -77,13 +80,19 @@ async def create_media(
     **Requirements:**
     - File must exist in storage (uploaded via presigned URL)
     - User must be member of the slip's container
+
+    Images get resized renditions in the background after the response;
+    feeds serve them once ready (see `media_width` on slip endpoints).
     """
     service = MediaService(session)
-    return service.create_media(media_data, user_id)
+    media = service.create_media(media_data, user_id)
+    if settings.MEDIA_RENDITIONS_ENABLED and media.media_type == "image":
+        background_tasks.add_task(generate_renditions, media.media_id)
+    return media
 
 
 @router.get("/{media_id}", response_model=MediaResponse)
-async def get_media(
+def get_media(
     media_id: int,
     user_id: int = Depends(get_current_user_id),
     session: Session = Depends(get_session)
@@ -98,7 +107,7 @@ async def get_media(
 
 
 @router.get("/slip/{slip_id}", response_model=List[MediaResponse])
-async def get_slip_media(
+def get_slip_media(
     slip_id: int,
     user_id: int = Depends(get_current_user_id),
     session: Session = Depends(get_session)
@@ -114,7 +123,7 @@ async def get_slip_media(
 
 
 @router.put("/{media_id}", response_model=MediaResponse)
-async def update_media(
+def update_media(
     media_id: int,
     media_data: MediaUpdate,
     user_id: int = Depends(get_current_user_id),
@@ -130,7 +139,7 @@ async def update_media(
 
 
 @router.delete("/{media_id}")
-async def delete_media(
+def delete_media(
     media_id: int,
     user_id: int = Depends(get_current_user_id),
     session: Session = Depends(get_session)
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlmodel import Session
-from typing import List
+from typing import List, Optional
 
 from ..cores.database import get_session
 from ..cores.security import get_current_user_id
+from ..cores.pagination import NEXT_CURSOR_HEADER, next_cursor
 from ..repos.reaction_repo import ReactionRepository
 from ..repos.slip_repo import SlipRepository
 from ..repos.membership_repo import MembershipRepository
@@ -38,6 +39,11 @@ def toggle_reaction(
     - If user reacted with same type: Remove reaction
     - If user reacted with different type: Update to new type
 
+    **Response:** `action` ("added", "removed" or "updated"),
+    `previous_reaction_type` (the type it replaced or removed, else null),
+    and the slip's updated `reaction_count` and `reaction_summary`
+    (`[{"reaction_type", "count"}]`, most used first)
+
     **Request:**
     ```json
     {
@@ -54,6 +60,9 @@ def toggle_reaction(
 @router.get("/slip/{slip_id}", response_model=List[ReactionResponse])
 def get_slip_reactions(
     slip_id: int,
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     user_id: int = Depends(get_current_user_id),
     reaction_service: ReactionService = Depends(get_reaction_service)
 ):
@@ -61,8 +70,16 @@ def get_slip_reactions(
     Get all reactions for a slip
 
     Returns detailed list of all reactions with user info
+
+    **Query Parameters:**
+    - limit: Number of reactions to return (default: all)
+    - cursor: Keyset cursor from the X-Next-Cursor header
     """
-    return reaction_service.get_slip_reactions(slip_id, user_id)
+    reactions = reaction_service.get_slip_reactions(slip_id, user_id, limit, cursor)
+    cursor_value = next_cursor(reactions, "slip_reaction_id", limit)
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
+    return reactions
 
 
 @router.get("/slip/{slip_id}/summary", response_model=List[ReactionSummary])
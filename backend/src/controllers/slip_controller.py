@@ -1,20 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlmodel import Session
-from typing import List
+from typing import List, Optional
 
 from ..cores.database import get_session
 from ..cores.security import get_current_user_id
+from ..cores.pagination import NEXT_CURSOR_HEADER, next_cursor
 from ..models.slip import SlipCreate, SlipUpdate, SlipResponse
 from ..services.slip_service import SlipService
+from ..services.rendition_service import RenditionRequest
 
 
 router = APIRouter(prefix="/slips", tags=["Slips"])
 
 
+def rendition_request(
+    media_width: Optional[int] = Query(None, ge=1, le=4096, description="Displayed image width in px, device pixels"),
+    media_format: Optional[str] = Query(None, pattern="^(webp|jpeg)$", description="Preferred rendition format")
+) -> RenditionRequest:
+    """
+    Which image rendition the client wants in media download URLs
+
+    The smallest rendition at least media_width wide is served; without
+    media_width (or before renditions exist) the original is.
+    """
+    return RenditionRequest(width=media_width, format=media_format)
+
+
 @router.post("", response_model=SlipResponse, status_code=status.HTTP_201_CREATED)
-async def create_slip(
+def create_slip(
     slip_data: SlipCreate,
     user_id: int = Depends(get_current_user_id),
+    rendition: RenditionRequest = Depends(rendition_request),
     session: Session = Depends(get_session)
 ):
     """
@@ -23,14 +39,15 @@ async def create_slip(
     - User must be a member of the container
     - Slip is authored by current user
     """
-    service = SlipService(session)
+    service = SlipService(session, rendition)
     return service.create_slip(slip_data, user_id)
 
 
 @router.get("/{slip_id}", response_model=SlipResponse)
-async def get_slip(
+def get_slip(
     slip_id: int,
     user_id: int = Depends(get_current_user_id),
+    rendition: RenditionRequest = Depends(rendition_request),
     session: Session = Depends(get_session)
 ):
     """
@@ -38,16 +55,19 @@ async def get_slip(
 
     User must be a member of the container to view the slip
     """
-    service = SlipService(session)
+    service = SlipService(session, rendition)
     return service.get_slip(slip_id, user_id)
 
 
 @router.get("", response_model=List[SlipResponse])
-async def get_slips(
+def get_slips(
+    response: Response,
     container_id: int = Query(..., description="Container ID to get slips from"),
     skip: int = Query(0, ge=0, description="Number of slips to skip"),
     limit: int = Query(50, ge=1, le=100, description="Max slips to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor of the previous page"),
     user_id: int = Depends(get_current_user_id),
+    rendition: RenditionRequest = Depends(rendition_request),
     session: Session = Depends(get_session)
 ):
     """
@@ -55,18 +75,27 @@ async def get_slips(
 
     - User must be a member of the container
     - Returns slips ordered by created_at DESC (newest first)
-    - Supports pagination
+    - Supports pagination: pass `cursor` for keyset paging (constant cost
+      at any depth) or `skip` for offset paging
+    - The next page cursor is returned in the X-Next-Cursor header
     """
-    service = SlipService(session)
-    return service.get_container_slips(container_id, user_id, skip, limit)
+    service = SlipService(session, rendition)
+    slips = service.get_container_slips(container_id, user_id, skip, limit, cursor)
+    cursor_value = next_cursor(slips, "slip_id", limit)
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
+    return slips
 
 
 @router.get("/author/{author_id}", response_model=List[SlipResponse])
-async def get_user_slips(
+def get_user_slips(
     author_id: int,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor of the previous page"),
     user_id: int = Depends(get_current_user_id),
+    rendition: RenditionRequest = Depends(rendition_request),
     session: Session = Depends(get_session)
 ):
     """
@@ -74,16 +103,22 @@ async def get_user_slips(
 
     - Returns only slips in containers current user has access to
     - Ordered by created_at DESC (newest first)
+    - Supports `cursor` keyset pagination; next cursor in X-Next-Cursor
     """
-    service = SlipService(session)
-    return service.get_user_slips(author_id, user_id, skip, limit)
+    service = SlipService(session, rendition)
+    slips = service.get_user_slips(author_id, user_id, skip, limit, cursor)
+    cursor_value = next_cursor(slips, "slip_id", limit)
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
+    return slips
 
 
 @router.put("/{slip_id}", response_model=SlipResponse)
-async def update_slip(
+def update_slip(
     slip_id: int,
     slip_data: SlipUpdate,
     user_id: int = Depends(get_current_user_id),
+    rendition: RenditionRequest = Depends(rendition_request),
     session: Session = Depends(get_session)
 ):
     """
@@ -91,12 +126,12 @@ async def update_slip(
 
     Only the author can update their slip
     """
-    service = SlipService(session)
+    service = SlipService(session, rendition)
     return service.update_slip(slip_id, slip_data, user_id)
 
 
 @router.delete("/{slip_id}")
-async def delete_slip(
+def delete_slip(
     slip_id: int,
     user_id: int = Depends(get_current_user_id),
     session: Session = Depends(get_session)
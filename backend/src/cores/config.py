@@ -13,14 +13,38 @@ class Settings(BaseSettings):
     DB_USER: str = "root"
     DB_PASSWORD: str = ""
     DB_NAME: str = "jar_talk"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 3600  # seconds; keep below MySQL wait_timeout
+    DB_POOL_PRE_PING: bool = True  # SELECT 1 on every checkout; off relies on DB_POOL_RECYCLE
+
+    # Read replicas ("host" or "host:port", same user/password/database) for GET requests
+    DB_REPLICA_HOSTS: list = []
+    DB_READ_YOUR_WRITES_SECONDS: int = 5  # A user's reads stay on the primary this long after a write
+
+    # Read container.member_count (kept in sync on join/leave) instead of counting members
+    CONTAINER_MEMBER_COUNT_DENORMALIZED: bool = False
+
+    # User profile cache (slim author info shared across requests; 0 = disabled)
+    USER_PROFILE_CACHE_SIZE: int = 10000
+    USER_PROFILE_CACHE_TTL: int = 300  # seconds
+
+    # Deactivate expired invites in the background every N seconds (0 = disabled)
+    INVITE_SWEEP_INTERVAL: int = 300
 
     # Firebase (Backend chỉ cần credentials file)
     FIREBASE_CREDENTIALS_PATH: Optional[str] = None
+    FIREBASE_PROJECT_ID: Optional[str] = None  # Defaults to the credentials' project
+    # Public keys for ID token verification (cached per their Cache-Control max-age)
+    FIREBASE_CERTS_URL: str = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
 
     # JWT
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    JWT_CLAIMS_CACHE_SIZE: int = 10000  # Max cached verified tokens (0 = disabled)
+    JWT_CLAIMS_CACHE_TTL: int = 300  # seconds; an entry also never outlives the token's exp
 
     # Storage (MinIO/S3)
     STORAGE_ENDPOINT: str = "192.168.0.101:9000"
@@ -30,6 +54,19 @@ class Settings(BaseSettings):
     STORAGE_REGION: str = "us-east-1"
     STORAGE_USE_SSL: bool = False
     PRESIGNED_URL_EXPIRY: int = 3600  # 1 hour
+    PRESIGNED_URL_CACHE_SIZE: int = 10000  # Max cached download URLs (0 = disabled)
+    PRESIGNED_URL_REUSE_FRACTION: float = 0.5  # Reuse a URL for this fraction of its expiry
+    # Download URLs: "presigned" (short-lived), "stable" (fixed per window, cacheable) or "public"
+    STORAGE_URL_MODE: str = "presigned"
+    STORAGE_STABLE_URL_WINDOW: int = 86400  # stable: URLs change once per window (seconds)
+    STORAGE_STABLE_URL_EXPIRY: int = 604800  # stable: signed validity, at most 7 days for SigV4
+    STORAGE_PUBLIC_BASE_URL: Optional[str] = None  # public: CDN/proxy base URL, key is appended
+    # Image renditions generated after upload (needs Pillow); widths in px
+    MEDIA_RENDITIONS_ENABLED: bool = True
+    MEDIA_RENDITION_WIDTHS: list = [200, 480, 1080]
+    MEDIA_RENDITION_FORMATS: list = ["webp", "jpeg"]  # First one is served unless the client asks
+    STORAGE_STARTUP_TIMEOUT: int = 2  # Connect/read timeout (seconds) for the startup bucket check
+    STORAGE_STARTUP_ATTEMPTS: int = 3  # Tries for the startup bucket check
 
     # CORS
     ALLOWED_ORIGINS: list = ["*"]
@@ -1,16 +1,113 @@
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import TextClause
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from fastapi import HTTPException, Request
+from .cache import TTLCache
 from .config import settings
-from typing import Generator
+from .security import verify_access_token
+from contextlib import contextmanager
+from typing import Callable, Generator, Optional, Sequence
+import random
+import re
+import threading
+import time
 
 
-DATABASE_URL = f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+def _database_url(host: str, port: int) -> str:
+    return f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{host}:{port}/{settings.DB_NAME}"
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-)
+
+DATABASE_URL = _database_url(settings.DB_HOST, settings.DB_PORT)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long checkouts wait and how often they time out
+
+    Only checkouts that reach the pool's queue are timed; a session reusing
+    its already checked-out connection costs nothing here.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def recreate(self):
+        # Keep the counters when the pool is rebuilt (e.g. after a disconnect)
+        pool = super().recreate()
+        pool.__dict__.update({
+            key: getattr(self, key)
+            for key in ("_stats_lock", "checkouts", "timeouts", "wait_total", "wait_max")
+        })
+        return pool
+
+    def stats(self) -> dict:
+        """Pool occupancy and checkout wait/timeout counters"""
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "max_overflow": self._max_overflow,
+                "checked_out": self.checkedout(),
+                "idle": self.checkedin(),
+                "overflow": max(self.overflow(), 0),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+            }
+
+
+def _create_engine(url: str) -> Engine:
+    """Engine with the configured, instrumented connection pool"""
+    # Without pre-ping, stale connections are avoided by recycling them before
+    # MySQL's wait_timeout; one that still fails is invalidated on the error
+    return create_engine(
+        url,
+        echo=settings.DEBUG,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+
+
+def _replica_url(host: str) -> str:
+    """DB_REPLICA_HOSTS entries are "host" or "host:port"; user, password and name match the primary"""
+    name, _, port = host.partition(":")
+    return _database_url(name, int(port) if port else settings.DB_PORT)
+
+
+# Primary (all writes) and read replicas
+engine = _create_engine(DATABASE_URL)
+replica_engines = [_create_engine(_replica_url(host)) for host in settings.DB_REPLICA_HOSTS]
+
+# Sync endpoints run on AnyIO's worker threads; each one holds at most one
+# DB connection, so more threads than connections would only queue on the pool
+WORKER_THREADS = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
 
 
 def create_db_and_tables():
@@ -18,7 +115,261 @@ def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
 
 
-def get_session() -> Generator[Session, None, None]:
-    """Dependency for getting database session"""
-    with Session(engine) as session:
+def _needs_primary(clause) -> bool:
+    """DML, raw SQL (it may write) and locking reads must run on the primary"""
+    if clause is None:
+        return False
+    return (
+        clause.is_dml
+        or isinstance(clause, TextClause)
+        or getattr(clause, "_for_update_arg", None) is not None
+    )
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from a replica when opened read_only
+
+    Writes always go to the primary: the first flush, DML or text()
+    statement or SELECT ... FOR UPDATE moves the session to the primary for
+    the rest of its life, so it never reads back its own writes from a
+    lagging replica. `wrote` records that it happened.
+    """
+
+    def __init__(self, primary: Engine, replica: Optional[Engine] = None, **kwargs):
+        super().__init__(primary, **kwargs)
+        self.primary = primary
+        self.replica = replica
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or _needs_primary(clause):
+            self.wrote = True
+            self.replica = None
+        return self.replica if self.replica is not None else self.primary
+
+
+class SessionRouter:
+    """
+    Opens sessions on the primary or a random replica
+
+    Per request: GET/HEAD/OPTIONS read from a replica, other methods use the
+    primary. A user who sent a write (any non-GET request, or a GET whose
+    session wrote) is pinned to the primary for sticky_seconds afterwards
+    (read-your-writes); the pin is per worker process.
+    """
+
+    READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+    def __init__(self, primary: Engine, replicas: Sequence[Engine] = (), sticky_seconds: float = 5.0):
+        self.primary = primary
+        self.replicas = list(replicas)
+        # user_id -> True while their recent writes may not have replicated
+        self.recent_writers = TTLCache(maxsize=100_000, ttl=sticky_seconds)
+
+    def open(self, read_only: bool = False) -> RoutingSession:
+        """New session; read_only picks a replica if any are configured"""
+        replica = random.choice(self.replicas) if read_only and self.replicas else None
+        return RoutingSession(self.primary, replica)
+
+    def _request_user_id(self, request: Request) -> Optional[int]:
+        """User ID from a valid bearer token, else None (auth itself is checked elsewhere)"""
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            return verify_access_token(token).user_id
+        except HTTPException:
+            return None
+
+    def for_request(self, request: Request, primary: bool = False) -> Generator[Session, None, None]:
+        """
+        Session routed by the request's method and the caller's recent writes
+
+        primary=True keeps a read request on the primary (see get_primary_session).
+        """
+        if not self.replicas:
+            with self.open() as session:
+                yield session
+            return
+
+        user_id = self._request_user_id(request)
+        is_read = request.method in self.READ_METHODS
+        read_only = is_read and not primary and (user_id is None or not self.recent_writers.get(user_id))
+        session = self.open(read_only=read_only)
+        try:
+            with session:
+                yield session
+        finally:
+            # Restart the window when the write ends; it may have run long
+            if user_id is not None and (not is_read or session.wrote):
+                self.recent_writers.set(user_id, True)
+
+    def pool_stats(self) -> dict:
+        """Primary pool telemetry, plus one entry per replica"""
+        stats = self.primary.pool.stats()
+        if self.replicas:
+            stats["replicas"] = [replica.pool.stats() for replica in self.replicas]
+        return stats
+
+
+session_router = SessionRouter(engine, replica_engines, settings.DB_READ_YOUR_WRITES_SECONDS)
+
+
+def pool_stats() -> dict:
+    """Connection pool telemetry for this worker process"""
+    return session_router.pool_stats()
+
+
+def get_session(request: Request) -> Generator[Session, None, None]:
+    """
+    Dependency for getting database session
+
+    GET requests read from a replica when DB_REPLICA_HOSTS is set
+    """
+    yield from session_router.for_request(request)
+
+
+def get_primary_session(request: Request) -> Generator[Session, None, None]:
+    """
+    Dependency for a session on the primary, whatever the method
+
+    For read endpoints that must see writes the read-your-writes pin can't
+    know about, e.g. /auth/me right after a signup that had no bearer token.
+    """
+    yield from session_router.for_request(request, primary=True)
+
+
+# MySQL error numbers the repositories act on
+ER_DUP_ENTRY = 1062
+ER_LOCK_WAIT_TIMEOUT = 1205
+ER_LOCK_DEADLOCK = 1213
+
+
+def db_error_code(error: DBAPIError) -> Optional[int]:
+    """MySQL error number of a wrapped driver error, or None (e.g. SQLite)"""
+    args = getattr(error.orig, "args", ())
+    return args[0] if args and isinstance(args[0], int) else None
+
+
+def duplicate_key(error: DBAPIError) -> Optional[str]:
+    """
+    Unique key a duplicate-entry error hit, or None for any other error
+
+    MySQL names the index ("... for key 'user.ix_user_username'"); SQLite,
+    used by the local test scripts, names the columns ("UNIQUE constraint
+    failed: user.username"). Callers match on the column name.
+    """
+    args = getattr(error.orig, "args", ())
+    if db_error_code(error) == ER_DUP_ENTRY:
+        match = re.search(r"for key '([^']+)'", str(args[1]) if len(args) > 1 else "")
+        return match.group(1) if match else ""
+    message = str(args[0]) if args else ""
+    if message.startswith("UNIQUE constraint failed: "):
+        return message.split(": ", 1)[1]
+    return None
+
+
+def is_lock_conflict(error: DBAPIError) -> bool:
+    """Deadlock or lock wait timeout: MySQL rolled back, the transaction can be retried"""
+    return db_error_code(error) in (ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT)
+
+
+# session.info keys used by unit_of_work()
+_UNIT_OF_WORK = "unit_of_work"
+_AFTER_COMMIT = "after_commit"
+
+
+@contextmanager
+def unit_of_work(session: Session) -> Generator[Session, None, None]:
+    """
+    Group repository writes into one transaction
+
+    Inside the block repositories only flush; the block commits once on
+    exit, or rolls back if it raises. Nested blocks join the outer one.
+    """
+    if session.info.get(_UNIT_OF_WORK):
         yield session
+        return
+
+    session.info[_UNIT_OF_WORK] = True
+    session.info[_AFTER_COMMIT] = []
+    try:
+        yield session
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    else:
+        for callback in session.info[_AFTER_COMMIT]:
+            callback()
+    finally:
+        session.info.pop(_UNIT_OF_WORK, None)
+        session.info.pop(_AFTER_COMMIT, None)
+
+
+def commit_or_flush(session: Session, *instances):
+    """
+    Commit the repository write, or only flush it inside unit_of_work()
+
+    Instances are refreshed after a real commit so callers can keep using
+    them; inside a unit of work they are still loaded, so no reload is needed.
+    """
+    if session.info.get(_UNIT_OF_WORK):
+        session.flush()
+        return
+
+    session.commit()
+    for instance in instances:
+        session.refresh(instance)
+
+
+def in_unit_of_work(session: Session) -> bool:
+    """True inside unit_of_work(), where repositories must not commit or roll back"""
+    return bool(session.info.get(_UNIT_OF_WORK))
+
+
+def after_commit(session: Session, callback: Callable[[], None]):
+    """Run callback once the write is committed (e.g. cache invalidation)"""
+    if session.info.get(_UNIT_OF_WORK):
+        session.info[_AFTER_COMMIT].append(callback)
+    else:
+        callback()
+
+
+def insert_unique(session: Session, instance, columns: Sequence[str] = ()) -> bool:
+    """
+    Insert instance, or return False if it duplicates a unique key
+
+    Lets callers rely on the unique index instead of probing first. Inside
+    unit_of_work() the insert runs in a savepoint so a conflict keeps the
+    outer transaction; otherwise it commits (and refreshes) like commit_or_flush.
+    With `columns`, only duplicates on those columns' keys return False.
+    Other integrity errors (foreign key, NOT NULL, other keys) are raised.
+    """
+    def is_conflict(error: IntegrityError) -> bool:
+        key = duplicate_key(error)
+        if key is None:
+            return False
+        return not columns or any(key.endswith(column) for column in columns)
+
+    if session.info.get(_UNIT_OF_WORK):
+        try:
+            with session.begin_nested():
+                session.add(instance)
+        except IntegrityError as e:
+            if not is_conflict(e):
+                raise
+            return False
+        return True
+
+    session.add(instance)
+    try:
+        session.commit()
+    except IntegrityError as e:
+        session.rollback()
+        if not is_conflict(e):
+            raise
+        return False
+    session.refresh(instance)
+    return True
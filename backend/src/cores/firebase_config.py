@@ -1,9 +1,18 @@
 import firebase_admin
 from firebase_admin import credentials, auth
 from .config import settings
+import httpx
+import logging
 import os
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from jose import JWTError, jwt
 
 
+logger = logging.getLogger(__name__)
+
 firebase_app = None
 
 
@@ -30,13 +39,133 @@ def initialize_firebase():
     return firebase_app
 
 
+class FirebaseTokenVerifier:
+    """
+    Verify Firebase ID tokens locally against Google's public certificates
+
+    The certificates are fetched once and kept for the Cache-Control max-age
+    the key server sends, so a login costs no network call while they are
+    fresh. An unknown key ID triggers an early refetch (Google rotated keys),
+    at most once per refetch_interval so forged kids cannot hammer the server.
+
+    One thread refreshes at a time, without blocking logins that the cached
+    certificates can already serve. A failed refresh keeps the cached set
+    (Google keeps old keys valid for hours after rotating) and is retried
+    after refetch_interval.
+    """
+
+    refetch_interval = 60.0  # seconds
+
+    def __init__(self, certs_url: str, project_id: Optional[str] = None, timeout: float = 5.0):
+        self.certs_url = certs_url
+        self.project_id = project_id
+        self.timeout = timeout
+        self.fetches = 0
+        self.fetch_failures = 0
+        self._certs: Dict[str, str] = {}
+        self._fetched_at = float("-inf")
+        self._expires_at = 0.0
+        self._refresh_lock = threading.Lock()
+
+    def _fetch_certs(self) -> Tuple[Dict[str, str], int]:
+        """Download the kid -> PEM certificate map and its max-age (seconds)"""
+        response = httpx.get(self.certs_url, timeout=self.timeout)
+        response.raise_for_status()
+        self.fetches += 1
+        match = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+        return response.json(), int(match.group(1)) if match else 0
+
+    def _needs_refresh(self, kid: str) -> bool:
+        """Cached set is stale, or lacks kid and wasn't fetched within refetch_interval"""
+        now = time.monotonic()
+        if now >= self._expires_at:
+            return True
+        return kid not in self._certs and now - self._fetched_at >= self.refetch_interval
+
+    def _refresh(self):
+        """Replace the cached certificates; on failure keep them and back off"""
+        try:
+            certs, max_age = self._fetch_certs()
+        except (httpx.HTTPError, ValueError) as e:
+            self.fetch_failures += 1
+            if not self._certs:
+                raise
+            logger.warning(
+                "Could not refresh Firebase certificates, serving %d cached keys: %s",
+                len(self._certs), e
+            )
+            self._fetched_at = time.monotonic()
+            self._expires_at = self._fetched_at + self.refetch_interval
+            return
+
+        self._certs = certs
+        self._fetched_at = time.monotonic()
+        self._expires_at = self._fetched_at + max_age
+
+    def get_cert(self, kid: str) -> Optional[str]:
+        """Certificate for a key ID, refreshing the cached set when stale or missing the key"""
+        if self._needs_refresh(kid):
+            # Threads that can be served from the cache don't wait for the fetch
+            if self._refresh_lock.acquire(blocking=kid not in self._certs):
+                try:
+                    # Checked again: another thread may have refreshed meanwhile
+                    if self._needs_refresh(kid):
+                        self._refresh()
+                finally:
+                    self._refresh_lock.release()
+        return self._certs.get(kid)
+
+    def _get_project_id(self) -> str:
+        """Configured project ID, else the one from the Firebase credentials"""
+        if self.project_id is None:
+            self.project_id = initialize_firebase().project_id
+        if not self.project_id:
+            raise ValueError("Firebase project ID is not configured")
+        return self.project_id
+
+    def verify(self, token: str) -> dict:
+        """
+        Verify an ID token's signature and claims and return them
+
+        Raises ValueError for any invalid token, like verify_firebase_token.
+        The decoded claims also carry "uid" (= sub), as the Admin SDK's do.
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+            if header.get("alg") != "RS256":
+                raise ValueError("Incorrect algorithm")
+            cert = self.get_cert(header.get("kid"))
+            if cert is None:
+                raise ValueError("Unknown key ID")
+
+            project_id = self._get_project_id()
+            claims = jwt.decode(
+                token,
+                cert,
+                algorithms=["RS256"],
+                audience=project_id,
+                issuer=f"https://securetoken.google.com/{project_id}"
+            )
+            if not claims.get("sub"):
+                raise ValueError("Token has no subject")
+            if claims.get("auth_time", 0) > time.time():
+                raise ValueError("Token auth_time is in the future")
+        except (JWTError, ValueError, httpx.HTTPError) as e:
+            raise ValueError(f"Invalid token: {str(e)}")
+
+        claims["uid"] = claims["sub"]
+        return claims
+
+
+token_verifier = FirebaseTokenVerifier(
+    certs_url=settings.FIREBASE_CERTS_URL,
+    project_id=settings.FIREBASE_PROJECT_ID
+)
+
+
 def verify_firebase_token(token: str) -> dict:
     """Verify Firebase ID token and return decoded token"""
-    try:
-        decoded_token = auth.verify_id_token(token)
-        return decoded_token
-    except Exception as e:
-        raise ValueError(f"Invalid token: {str(e)}")
+    return token_verifier.verify(token)
 
 
 def get_firebase_user(uid: str):
@@ -0,0 +1,60 @@
+"""
+Keyset (cursor) pagination helpers
+Cursors are opaque tokens encoding the (created_at, id) of the last row on a page
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) position as an opaque cursor"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor back to its (created_at, id) position"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def after_position(created_at_column, id_column, position: Tuple[datetime, int], descending: bool = True):
+    """
+    WHERE clause selecting rows after a cursor position
+
+    Matches ORDER BY created_at, id in the same direction, so it can be
+    served by a composite (..., created_at, id) index at any depth.
+    """
+    created_at, row_id = position
+    if descending:
+        return or_(
+            created_at_column < created_at,
+            and_(created_at_column == created_at, id_column < row_id)
+        )
+    return or_(
+        created_at_column > created_at,
+        and_(created_at_column == created_at, id_column > row_id)
+    )
+
+
+def next_cursor(items: List[Any], id_attr: str, limit: Optional[int]) -> Optional[str]:
+    """Cursor for the page after `items`, or None if this was the last page"""
+    if not limit or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, getattr(last, id_attr))
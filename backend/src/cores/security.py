@@ -1,14 +1,32 @@
+import logging
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, NamedTuple
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from .cache import TTLCache
 from .config import settings
 
 
+logger = logging.getLogger(__name__)
+
 security = HTTPBearer()
 
 
+class Principal(NamedTuple):
+    """Authenticated caller, built once per verified token"""
+    user_id: int
+    claims: dict
+
+
+# Cross-request LRU of token -> Principal; entries never outlive the token's exp
+principal_cache = TTLCache(
+    maxsize=settings.JWT_CLAIMS_CACHE_SIZE,
+    ttl=settings.JWT_CLAIMS_CACHE_TTL
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -23,43 +41,73 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def _credentials_error(detail: str) -> HTTPException:
+    """401 response asking the client to re-authenticate"""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 def decode_access_token(token: str) -> dict:
     """Decode JWT access token"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
     except JWTError as e:
-        print(f"JWT Error: {str(e)}")  # Debug logging
-        print(f"Token: {token[:20]}...")  # Show first 20 chars
-        print(f"Secret: {settings.SECRET_KEY[:10]}...")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Could not validate credentials: {str(e)}",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        logger.debug("JWT rejected: %s", e)
+        raise _credentials_error(f"Could not validate credentials: {str(e)}")
 
 
-async def get_current_user_id(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> int:
+def verify_access_token(token: str) -> Principal:
     """
-    Get current user ID from JWT token
+    Verify a JWT access token and return its principal
 
-    This is used to protect API endpoints.
-    Client must send: Authorization: Bearer <jwt_token>
+    Verified tokens are cached until their exp (capped by the cache TTL), so
+    repeat requests skip signature verification; rejected tokens are not cached.
     """
-    token = credentials.credentials
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     payload = decode_access_token(token)
     user_id = payload.get("sub")
+    if user_id is None:
+        raise _credentials_error("Could not validate credentials: user_id (sub) not found in token")
+    try:
+        principal = Principal(user_id=int(user_id), claims=payload)
+    except (TypeError, ValueError):
+        raise _credentials_error("Could not validate credentials: invalid user_id (sub) in token")
 
-    print(f"Decoded payload: {payload}")  # Debug
-    print(f"User ID from token: {user_id}")  # Debug
+    logger.debug("JWT verified for user %s", principal.user_id)
 
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials: user_id (sub) not found in token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    exp = payload.get("exp")
+    if exp is not None:
+        remaining = exp - time.time()
+        if remaining > 0:
+            principal_cache.set(token, principal, ttl=min(remaining, principal_cache.ttl))
+    return principal
 
-    return int(user_id)
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Principal:
+    """
+    Get the authenticated principal (user ID and claims) from the JWT token
+
+    Client must send: Authorization: Bearer <jwt_token>
+    """
+    return verify_access_token(credentials.credentials)
+
+
+async def get_current_user_id(
+    principal: Principal = Depends(get_current_principal)
+) -> int:
+    """
+    Get current user ID from JWT token
+
+    This is used to protect API endpoints.
+    Client must send: Authorization: Bearer <jwt_token>
+    """
+    return principal.user_id
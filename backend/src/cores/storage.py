@@ -4,45 +4,215 @@ Handles file upload/download with presigned URLs
 """
 import boto3
 from botocore.client import Config
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
 from .config import settings
+from .cache import TTLCache
+import hashlib
+import hmac
+import threading
+import time
 import uuid
-from datetime import timedelta
-from typing import Optional
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+
+
+class SigV4Presigner:
+    """
+    Offline SigV4 query-string presigner for path-style S3 URLs
+
+    Produces the same URLs as boto3's generate_presigned_url for get_object
+    and put_object, without botocore's per-call request building. The
+    signing key is derived once per date (it only depends on date, region
+    and service); a few dates are kept, since stable URLs sign with their
+    window's start date while uploads sign with today's.
+    """
+
+    ALGORITHM = "AWS4-HMAC-SHA256"
+    SERVICE = "s3"
+    MAX_EXPIRES = 604800  # S3 rejects X-Amz-Expires above 7 days
+    SIGNING_KEY_CACHE_SIZE = 3
+
+    def __init__(self, endpoint: str, access_key: str, secret_key: str, region: str, scheme: str = "http"):
+        self.base_url = f"{scheme}://{endpoint}"
+        # botocore drops the default port from the signed host header
+        default_port = {"http": ":80", "https": ":443"}[scheme]
+        self.host = endpoint[:-len(default_port)] if endpoint.endswith(default_port) else endpoint
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self._signing_keys: "OrderedDict[str, bytes]" = OrderedDict()
+        self._signing_keys_lock = threading.Lock()
+
+    def _get_signing_key(self, date: str) -> bytes:
+        """HMAC chain secret -> date -> region -> service -> aws4_request, LRU-cached per date"""
+        with self._signing_keys_lock:
+            key = self._signing_keys.get(date)
+            if key is not None:
+                self._signing_keys.move_to_end(date)
+                return key
+        key = ("AWS4" + self.secret_key).encode()
+        for part in (date, self.region, self.SERVICE, "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        with self._signing_keys_lock:
+            self._signing_keys[date] = key
+            while len(self._signing_keys) > self.SIGNING_KEY_CACHE_SIZE:
+                self._signing_keys.popitem(last=False)
+        return key
+
+    def presign(
+        self,
+        method: str,
+        bucket: str,
+        key: str,
+        expires_in: int,
+        content_type: Optional[str] = None,
+        params: Optional[Dict[str, str]] = None,
+        now: Optional[datetime] = None
+    ) -> str:
+        """
+        Presigned URL for method (GET/PUT) on bucket/key
+
+        content_type is signed when given; params are extra query parameters
+        (e.g. response-cache-control), placed first like boto3 does.
+        """
+        now = now or datetime.utcnow()
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date = amz_date[:8]
+        scope = f"{date}/{self.region}/{self.SERVICE}/aws4_request"
+
+        headers = {"host": self.host}
+        if content_type is not None:
+            headers["content-type"] = content_type
+        signed_headers = ";".join(sorted(headers))
+
+        path = "/" + quote(f"{bucket}/{key}", safe="/~")
+        query_params = list((params or {}).items()) + [
+            ("X-Amz-Algorithm", self.ALGORITHM),
+            ("X-Amz-Credential", f"{self.access_key}/{scope}"),
+            ("X-Amz-Date", amz_date),
+            ("X-Amz-Expires", str(expires_in)),
+            ("X-Amz-SignedHeaders", signed_headers),
+        ]
+        encoded = [(name, quote(value, safe='-_.~')) for name, value in query_params]
+        query = "&".join(f"{name}={value}" for name, value in encoded)
+        canonical_request = "\n".join([
+            method,
+            path,
+            "&".join(f"{name}={value}" for name, value in sorted(encoded)),
+            "".join(f"{name}:{headers[name]}\n" for name in sorted(headers)),
+            signed_headers,
+            "UNSIGNED-PAYLOAD",
+        ])
+        string_to_sign = "\n".join([
+            self.ALGORITHM,
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ])
+        signature = hmac.new(self._get_signing_key(date), string_to_sign.encode(), hashlib.sha256).hexdigest()
+        return f"{self.base_url}{path}?{query}&X-Amz-Signature={signature}"
 
 
 class StorageService:
-    """MinIO/S3 storage service with presigned URLs"""
+    """
+    MinIO/S3 storage service with presigned URLs
+
+    Constructing the service does no I/O: the S3 client is built on first
+    use, and the bucket is checked once at startup via ensure_bucket().
+
+    Download URLs follow STORAGE_URL_MODE:
+    - "presigned": short-lived signed URLs (default)
+    - "stable": signed URLs fixed for each STORAGE_STABLE_URL_WINDOW, so
+      browsers and CDNs can cache the object across feed refreshes
+    - "public": STORAGE_PUBLIC_BASE_URL + key, for a CDN or signing proxy
+      in front of the bucket
+    """
+
+    URL_MODES = ("presigned", "stable", "public")
 
     def __init__(self):
-        # Initialize S3 client for MinIO
-        self.s3_client = boto3.client(
+        if settings.STORAGE_URL_MODE not in self.URL_MODES:
+            raise ValueError(f"STORAGE_URL_MODE must be one of {self.URL_MODES}")
+        if settings.STORAGE_URL_MODE == "stable" and settings.STORAGE_STABLE_URL_EXPIRY <= settings.STORAGE_STABLE_URL_WINDOW:
+            raise ValueError("STORAGE_STABLE_URL_EXPIRY must exceed STORAGE_STABLE_URL_WINDOW")
+        if settings.STORAGE_URL_MODE == "stable" and settings.STORAGE_STABLE_URL_EXPIRY > SigV4Presigner.MAX_EXPIRES:
+            raise ValueError(f"STORAGE_STABLE_URL_EXPIRY must be at most {SigV4Presigner.MAX_EXPIRES} (7 days)")
+        if settings.STORAGE_URL_MODE == "public" and not settings.STORAGE_PUBLIC_BASE_URL:
+            raise ValueError("STORAGE_PUBLIC_BASE_URL is required in public mode")
+
+        self.url_mode = settings.STORAGE_URL_MODE
+        self.bucket_name = settings.STORAGE_BUCKET
+        # Signed download URLs, reused until PRESIGNED_URL_REUSE_FRACTION of their expiry
+        self.download_url_cache = TTLCache(
+            maxsize=settings.PRESIGNED_URL_CACHE_SIZE,
+            ttl=settings.PRESIGNED_URL_EXPIRY * settings.PRESIGNED_URL_REUSE_FRACTION
+        )
+        self._s3_client = None
+        self._client_lock = threading.Lock()
+        self.presigner = SigV4Presigner(
+            endpoint=settings.STORAGE_ENDPOINT,
+            access_key=settings.STORAGE_ACCESS_KEY,
+            secret_key=settings.STORAGE_SECRET_KEY,
+            region=settings.STORAGE_REGION
+        )
+
+    def _create_client(self, config: Config):
+        """S3 client for MinIO"""
+        return boto3.client(
             's3',
             endpoint_url=f"http://{settings.STORAGE_ENDPOINT}",
             aws_access_key_id=settings.STORAGE_ACCESS_KEY,
             aws_secret_access_key=settings.STORAGE_SECRET_KEY,
             region_name=settings.STORAGE_REGION,
-            config=Config(signature_version='s3v4')
+            config=config
         )
-        self.bucket_name = settings.STORAGE_BUCKET
-        self._ensure_bucket_exists()
 
-    def _ensure_bucket_exists(self):
-        """Create bucket if it doesn't exist"""
+    @property
+    def s3_client(self):
+        """S3 client, built on first use (boto3 clients are thread-safe once built)"""
+        if self._s3_client is None:
+            with self._client_lock:
+                if self._s3_client is None:
+                    self._s3_client = self._create_client(Config(signature_version='s3v4'))
+        return self._s3_client
+
+    def ensure_bucket(self) -> bool:
+        """
+        Create bucket if it doesn't exist; True if it is usable
+
+        Uses a separate client with STORAGE_STARTUP_TIMEOUT connect/read
+        timeouts and STORAGE_STARTUP_ATTEMPTS tries, so an unreachable
+        endpoint fails fast instead of waiting out botocore's defaults.
+        """
+        client = self._create_client(Config(
+            signature_version='s3v4',
+            connect_timeout=settings.STORAGE_STARTUP_TIMEOUT,
+            read_timeout=settings.STORAGE_STARTUP_TIMEOUT,
+            retries={'max_attempts': settings.STORAGE_STARTUP_ATTEMPTS, 'mode': 'standard'}
+        ))
         try:
-            self.s3_client.head_bucket(Bucket=self.bucket_name)
+            client.head_bucket(Bucket=self.bucket_name)
             print(f"✅ Bucket '{self.bucket_name}' exists")
+            return True
         except ClientError as e:
             error_code = e.response['Error']['Code']
-            if error_code == '404':
-                # Bucket doesn't exist, create it
-                try:
-                    self.s3_client.create_bucket(Bucket=self.bucket_name)
-                    print(f"✅ Created bucket '{self.bucket_name}'")
-                except Exception as create_error:
-                    print(f"❌ Failed to create bucket: {create_error}")
-            else:
+            if error_code != '404':
                 print(f"❌ Error checking bucket: {e}")
+                return False
+        except BotoCoreError as e:
+            print(f"❌ Storage unreachable: {e}")
+            return False
+
+        # Bucket doesn't exist, create it
+        try:
+            client.create_bucket(Bucket=self.bucket_name)
+            print(f"✅ Created bucket '{self.bucket_name}'")
+            return True
+        except (ClientError, BotoCoreError) as create_error:
+            print(f"❌ Failed to create bucket: {create_error}")
+            return False
 
     def generate_upload_url(
         self,
@@ -72,27 +242,21 @@ class StorageService:
         file_extension = self._get_extension_from_content_type(content_type)
         file_key = f"{file_type}/{uuid.uuid4()}{file_extension}"
 
-        try:
-            # Generate presigned URL for PUT
-            upload_url = self.s3_client.generate_presigned_url(
-                'put_object',
-                Params={
-                    'Bucket': self.bucket_name,
-                    'Key': file_key,
-                    'ContentType': content_type
-                },
-                ExpiresIn=expires_in
-            )
+        # Presigned URL for PUT (same URL boto3's put_object presign would give)
+        upload_url = self.presigner.presign(
+            'PUT',
+            self.bucket_name,
+            file_key,
+            expires_in,
+            content_type=content_type
+        )
 
-            return {
-                "upload_url": upload_url,
-                "file_key": file_key,
-                "content_type": content_type,
-                "expires_in": expires_in
-            }
-        except ClientError as e:
-            print(f"Error generating upload URL: {e}")
-            raise Exception(f"Failed to generate upload URL: {str(e)}")
+        return {
+            "upload_url": upload_url,
+            "file_key": file_key,
+            "content_type": content_type,
+            "expires_in": expires_in
+        }
 
     def generate_download_url(
         self,
@@ -102,6 +266,12 @@ class StorageService:
         """
         Generate presigned URL for downloading file
 
+        URLs are cached per file_key and reused until a fraction of their
+        expiry has passed, so a hot image is signed once per window.
+
+        In "stable" and "public" modes (see the class docstring) the URL
+        does not change between requests and expires_in is ignored.
+
         Args:
             file_key: File path in storage
             expires_in: URL expiry in seconds (default: 1 hour)
@@ -109,22 +279,47 @@ class StorageService:
         Returns:
             Presigned URL for download
         """
+        if self.url_mode == "public":
+            return f"{settings.STORAGE_PUBLIC_BASE_URL.rstrip('/')}/{quote(file_key, safe='/~')}"
+
         if expires_in is None:
             expires_in = settings.PRESIGNED_URL_EXPIRY
 
-        try:
-            download_url = self.s3_client.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': self.bucket_name,
-                    'Key': file_key
-                },
-                ExpiresIn=expires_in
-            )
-            return download_url
-        except ClientError as e:
-            print(f"Error generating download URL: {e}")
-            raise Exception(f"Failed to generate download URL: {str(e)}")
+        cache_key = (file_key, expires_in)
+        cached_url = self.download_url_cache.get(cache_key)
+        if cached_url is not None:
+            return cached_url
+
+        if self.url_mode == "stable":
+            download_url, ttl = self._stable_download_url(file_key)
+        else:
+            download_url = self.presigner.presign('GET', self.bucket_name, file_key, expires_in)
+            ttl = expires_in * settings.PRESIGNED_URL_REUSE_FRACTION
+        self.download_url_cache.set(cache_key, download_url, ttl=ttl)
+        return download_url
+
+    def _stable_download_url(self, file_key: str) -> Tuple[str, float]:
+        """
+        Signed URL that stays identical for the current time window, and its remaining life in the cache
+
+        Signing at the window start makes every request in the window get
+        the same URL. It stays valid at least EXPIRY - WINDOW seconds after
+        the window ends, which is what the response Cache-Control allows:
+        keys are never rewritten, so the object is immutable.
+        """
+        window = settings.STORAGE_STABLE_URL_WINDOW
+        now = time.time()
+        window_start = int(now) // window * window
+        max_age = settings.STORAGE_STABLE_URL_EXPIRY - window
+        url = self.presigner.presign(
+            'GET',
+            self.bucket_name,
+            file_key,
+            settings.STORAGE_STABLE_URL_EXPIRY,
+            params={"response-cache-control": f"public, max-age={max_age}, immutable"},
+            now=datetime.utcfromtimestamp(window_start)
+        )
+        return url, window_start + window - now
 
     def delete_file(self, file_key: str) -> bool:
         """
@@ -136,6 +331,8 @@ class StorageService:
         Returns:
             True if successful
         """
+        self.download_url_cache.pop((file_key, settings.PRESIGNED_URL_EXPIRY))
+
         try:
             self.s3_client.delete_object(
                 Bucket=self.bucket_name,
@@ -147,6 +344,26 @@ class StorageService:
             print(f"Error deleting file: {e}")
             return False
 
+    def read_file(self, file_key: str) -> bytes:
+        """Download a file's content"""
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=file_key)
+        return response['Body'].read()
+
+    def write_file(self, file_key: str, data: bytes, content_type: str):
+        """
+        Upload a server-generated file
+
+        Keys written here are derived and never rewritten, so they are
+        stored as immutable for browser and CDN caches.
+        """
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=file_key,
+            Body=data,
+            ContentType=content_type,
+            CacheControl="public, max-age=31536000, immutable"
+        )
+
     def file_exists(self, file_key: str) -> bool:
         """Check if file exists in storage"""
         try:
@@ -1,4 +1,5 @@
 from sqlmodel import Field, SQLModel
+from sqlalchemy import Index
 from datetime import datetime
 from typing import Optional
 
@@ -8,6 +9,10 @@ class Comment(SQLModel, table=True):
     Comment - A comment on a slip
     """
     __tablename__ = "comment"
+    __table_args__ = (
+        # Keyset pagination: ORDER BY created_at, comment_id per slip
+        Index("idx_comment_slip_created", "slip_id", "created_at", "comment_id"),
+    )
 
     comment_id: Optional[int] = Field(default=None, primary_key=True)
     slip_id: int = Field(foreign_key="slip.slip_id")
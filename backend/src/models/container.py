@@ -19,6 +19,7 @@ class Container(SQLModel, table=True):
     owner_id: int = Field(foreign_key="user.user_id")
     jar_style_settings: Optional[str] = Field(default=None)  # JSON string for customization
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    member_count: int = Field(default=0)  # Denormalised, maintained by MembershipRepository
 
 
 class ContainerCreate(SQLModel):
@@ -1,4 +1,5 @@
 from sqlmodel import Field, SQLModel
+from sqlalchemy import Index, Text
 from datetime import datetime
 from typing import Optional
 from enum import Enum
@@ -15,12 +16,19 @@ class Media(SQLModel, table=True):
     Media - Images or audio attached to slips
     """
     __tablename__ = "media"
+    __table_args__ = (
+        # Media of a slip in upload order
+        Index("idx_media_slip_created", "slip_id", "created_at", "media_id"),
+    )
 
     media_id: Optional[int] = Field(default=None, primary_key=True)
     slip_id: int = Field(foreign_key="slip.slip_id")
     media_type: str = Field(max_length=50)  # 'image' or 'audio'
     storage_url: str = Field(max_length=500)  # S3/MinIO file key
     caption: Optional[str] = Field(default=None, max_length=500)
+    # JSON list of resized copies: [{"width", "height", "format", "key"}, ...]
+    # NULL until the rendition pipeline has processed the image
+    renditions: Optional[str] = Field(default=None, sa_type=Text)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
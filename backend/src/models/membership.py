@@ -1,4 +1,5 @@
 from sqlmodel import Field, SQLModel
+from sqlalchemy import Index
 from datetime import datetime
 from typing import Optional
 from enum import Enum
@@ -15,6 +16,10 @@ class Membership(SQLModel, table=True):
     Membership - User's participation in a container
     """
     __tablename__ = "membership"
+    __table_args__ = (
+        # Covers membership/role checks for a (user, container) pair
+        Index("idx_membership_user_container", "user_id", "container_id", "role"),
+    )
 
     participant_id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.user_id")
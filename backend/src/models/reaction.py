@@ -1,4 +1,5 @@
 from sqlmodel import Field, SQLModel
+from sqlalchemy import Index, UniqueConstraint
 from datetime import datetime
 from typing import Optional, List
 
@@ -8,6 +9,15 @@ class SlipReaction(SQLModel, table=True):
     SlipReaction - A reaction to a slip
     """
     __tablename__ = "slipreaction"
+    __table_args__ = (
+        # One reaction per user per slip
+        UniqueConstraint("slip_id", "user_id", name="unique_user_slip_reaction"),
+        # Keyset pagination: ORDER BY created_at DESC, slip_reaction_id DESC per slip
+        Index("idx_slipreaction_slip_created", "slip_id", "created_at", "slip_reaction_id"),
+        # Serves reconcile_counters' per-type counts (by slip_id, reaction_type)
+        # and get_by_type; feeds read slipreactioncount instead
+        Index("idx_slipreaction_slip_type", "slip_id", "reaction_type", "created_at"),
+    )
 
     slip_reaction_id: Optional[int] = Field(default=None, primary_key=True)
     slip_id: int = Field(foreign_key="slip.slip_id")
@@ -16,6 +26,18 @@ class SlipReaction(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class SlipReactionCount(SQLModel, table=True):
+    """
+    SlipReactionCount - Denormalised count of one reaction type on a slip
+    Maintained by ReactionRepository, repaired by SlipRepository.reconcile_counters
+    """
+    __tablename__ = "slipreactioncount"
+
+    slip_id: int = Field(foreign_key="slip.slip_id", primary_key=True)
+    reaction_type: str = Field(max_length=50, primary_key=True)
+    count: int = Field(default=0)
+
+
 class ReactionCreate(SQLModel):
     """Schema for creating a reaction"""
     slip_id: int
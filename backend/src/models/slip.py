@@ -1,4 +1,5 @@
 from sqlmodel import Field, SQLModel, Relationship
+from sqlalchemy import Index
 from datetime import datetime
 from typing import Optional, List, TYPE_CHECKING
 
@@ -12,6 +13,11 @@ class Slip(SQLModel, table=True):
     Slip - A journal entry in a container
     """
     __tablename__ = "slip"
+    __table_args__ = (
+        # Keyset pagination: ORDER BY created_at DESC, slip_id DESC per container/author
+        Index("idx_slip_container_created", "container_id", "created_at", "slip_id"),
+        Index("idx_slip_author_created", "author_id", "created_at", "slip_id"),
+    )
 
     slip_id: Optional[int] = Field(default=None, primary_key=True)
     container_id: int = Field(foreign_key="container.container_id")
@@ -20,6 +26,9 @@ class Slip(SQLModel, table=True):
     text_content: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     location_data: Optional[str] = Field(default=None, max_length=500)  # coordinates, city
+    # Denormalised, maintained by CommentRepository / ReactionRepository
+    comment_count: int = Field(default=0)
+    reaction_count: int = Field(default=0)
 
 
 class SlipCreate(SQLModel):
@@ -0,0 +1,31 @@
+"""
+Aggregate query helpers shared by repositories
+Counts are computed in SQL with COUNT(*) instead of materialising ORM rows
+"""
+from sqlmodel import Session, select, func
+from typing import Any, Dict, Iterable, Type
+
+
+def count_rows(session: Session, model: Type, *criteria) -> int:
+    """SELECT COUNT(*) FROM model WHERE criteria"""
+    statement = select(func.count()).select_from(model).where(*criteria)
+    return session.exec(statement).one()
+
+
+def count_grouped(session: Session, key_column, keys: Iterable[Any], *criteria) -> Dict[Any, int]:
+    """
+    SELECT key, COUNT(*) ... WHERE key IN (keys) GROUP BY key
+
+    Keys without matching rows are returned with a count of 0.
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    statement = (
+        select(key_column, func.count())
+        .where(key_column.in_(keys), *criteria)
+        .group_by(key_column)
+    )
+    counts = {key: 0 for key in keys}
+    counts.update({key: count for key, count in session.exec(statement).all()})
+    return counts
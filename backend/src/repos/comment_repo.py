@@ -1,6 +1,11 @@
-from sqlmodel import Session, select
-from typing import Optional, List
+from sqlmodel import Session, select, func, update, delete
+from typing import Optional, List, Dict, Tuple
+from datetime import datetime
 from ..models.comment import Comment, CommentCreate, CommentUpdate
+from ..models.slip import Slip
+from .aggregates import count_rows, count_grouped
+from ..cores.pagination import after_position
+from ..cores.database import commit_or_flush
 
 
 class CommentRepository:
@@ -13,14 +18,52 @@ class CommentRepository:
         """Get comment by ID"""
         return self.session.get(Comment, comment_id)
 
-    def get_by_slip(self, slip_id: int, skip: int = 0, limit: int = 100) -> List[Comment]:
-        """Get all comments for a slip"""
+    def get_by_slip(
+        self,
+        slip_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Comment]:
+        """
+        Get all comments for a slip, oldest first
+
+        Pass `after` (created_at, comment_id) of the last comment seen for
+        keyset pagination; `skip` is then ignored.
+        """
+        statement = select(Comment).where(Comment.slip_id == slip_id)
+        if after:
+            statement = statement.where(
+                after_position(Comment.created_at, Comment.comment_id, after, descending=False)
+            )
+        else:
+            statement = statement.offset(skip)
+        statement = statement.order_by(Comment.created_at.asc(), Comment.comment_id.asc()).limit(limit)
+        return list(self.session.exec(statement).all())
+
+    def get_first_by_slips(self, slip_ids: List[int], per_slip: int = 3) -> List[Comment]:
+        """
+        Get the first `per_slip` comments of each slip in a single query
+
+        Uses ROW_NUMBER() partitioned by slip, so the result matches calling
+        get_by_slip(slip_id, skip=0, limit=per_slip) for every slip.
+        """
+        if not slip_ids:
+            return []
+        row_number = func.row_number().over(
+            partition_by=Comment.slip_id,
+            order_by=(Comment.created_at.asc(), Comment.comment_id.asc())
+        ).label("row_number")
+        ranked = (
+            select(Comment.comment_id, row_number)
+            .where(Comment.slip_id.in_(slip_ids))
+            .subquery()
+        )
         statement = (
             select(Comment)
-            .where(Comment.slip_id == slip_id)
-            .order_by(Comment.created_at.asc())  # Oldest first
-            .offset(skip)
-            .limit(limit)
+            .join(ranked, Comment.comment_id == ranked.c.comment_id)
+            .where(ranked.c.row_number <= per_slip)
+            .order_by(Comment.slip_id, Comment.created_at.asc(), Comment.comment_id.asc())
         )
         return list(self.session.exec(statement).all())
 
@@ -42,8 +85,8 @@ class CommentRepository:
             author_id=author_id
         )
         self.session.add(comment)
-        self.session.commit()
-        self.session.refresh(comment)
+        self._adjust_comment_count(comment.slip_id, 1)
+        commit_or_flush(self.session, comment)
         return comment
 
     def update(self, comment_id: int, comment_data: CommentUpdate) -> Optional[Comment]:
@@ -54,8 +97,7 @@ class CommentRepository:
 
         comment.text_content = comment_data.text_content
         self.session.add(comment)
-        self.session.commit()
-        self.session.refresh(comment)
+        commit_or_flush(self.session, comment)
         return comment
 
     def delete(self, comment_id: int) -> bool:
@@ -64,11 +106,29 @@ class CommentRepository:
         if not comment:
             return False
 
-        self.session.delete(comment)
-        self.session.commit()
+        # The counter follows the DELETE's own rowcount: of two concurrent
+        # deletes of one comment only the one that removed it decrements
+        removed = self.session.exec(delete(Comment).where(Comment.comment_id == comment_id)).rowcount
+        if not removed:
+            return False
+
+        self._adjust_comment_count(comment.slip_id, -1)
+        commit_or_flush(self.session)
         return True
 
     def count_by_slip(self, slip_id: int) -> int:
         """Count comments on a slip"""
-        statement = select(Comment).where(Comment.slip_id == slip_id)
-        return len(list(self.session.exec(statement).all()))
+        return count_rows(self.session, Comment, Comment.slip_id == slip_id)
+
+    def count_by_slips(self, slip_ids: List[int]) -> Dict[int, int]:
+        """Count comments for several slips, grouped by slip_id"""
+        return count_grouped(self.session, Comment.slip_id, slip_ids)
+
+    def _adjust_comment_count(self, slip_id: int, delta: int):
+        """Keep slip.comment_count in sync, in the same transaction as the comment write"""
+        statement = (
+            update(Slip)
+            .where(Slip.slip_id == slip_id)
+            .values(comment_count=Slip.comment_count + delta)
+        )
+        self.session.exec(statement)
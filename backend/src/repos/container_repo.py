@@ -1,6 +1,10 @@
-from sqlmodel import Session, select
-from typing import Optional, List
+from sqlmodel import Session, select, func
+from sqlalchemy.orm import aliased
+from typing import Optional, List, Tuple
 from ..models.container import Container, ContainerCreate, ContainerUpdate
+from ..models.membership import Membership
+from ..cores.config import settings
+from ..cores.database import commit_or_flush
 
 
 class ContainerRepository:
@@ -23,6 +27,34 @@ class ContainerRepository:
         statement = select(Container).where(Container.owner_id == owner_id)
         return list(self.session.exec(statement).all())
 
+    def get_user_containers_with_role(self, user_id: int) -> List[Tuple[Container, str, int]]:
+        """
+        Get all containers a user is member of, in one query
+
+        Returns (container, user's role, member count) tuples. The count is
+        read from container.member_count when CONTAINER_MEMBER_COUNT_DENORMALIZED
+        is set, otherwise computed with GROUP BY over the container's members.
+        """
+        caller = aliased(Membership)
+        if settings.CONTAINER_MEMBER_COUNT_DENORMALIZED:
+            statement = (
+                select(Container, caller.role, Container.member_count)
+                .join(caller, caller.container_id == Container.container_id)
+                .where(caller.user_id == user_id)
+                .order_by(caller.participant_id)
+            )
+        else:
+            members = aliased(Membership)
+            statement = (
+                select(Container, caller.role, func.count(members.participant_id))
+                .join(caller, caller.container_id == Container.container_id)
+                .join(members, members.container_id == Container.container_id)
+                .where(caller.user_id == user_id)
+                .group_by(Container.container_id, caller.participant_id, caller.role)
+                .order_by(caller.participant_id)
+            )
+        return [tuple(row) for row in self.session.exec(statement).all()]
+
     def create(self, container_data: ContainerCreate, owner_id: int) -> Container:
         """Create a new container"""
         container = Container(
@@ -30,8 +62,7 @@ class ContainerRepository:
             owner_id=owner_id
         )
         self.session.add(container)
-        self.session.commit()
-        self.session.refresh(container)
+        commit_or_flush(self.session, container)
         return container
 
     def update(self, container_id: int, container_data: ContainerUpdate) -> Optional[Container]:
@@ -45,8 +76,7 @@ class ContainerRepository:
             setattr(container, key, value)
 
         self.session.add(container)
-        self.session.commit()
-        self.session.refresh(container)
+        commit_or_flush(self.session, container)
         return container
 
     def delete(self, container_id: int) -> bool:
@@ -56,5 +86,5 @@ class ContainerRepository:
             return False
 
         self.session.delete(container)
-        self.session.commit()
+        commit_or_flush(self.session)
         return True
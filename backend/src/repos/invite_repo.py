@@ -1,7 +1,8 @@
-from sqlmodel import Session, select
+from sqlmodel import Session, select, update, or_
 from typing import Optional, List
 from datetime import datetime
 from ..models.invite import Invite, InviteCreate
+from ..cores.database import commit_or_flush, insert_unique
 
 
 class InviteRepository:
@@ -20,17 +21,21 @@ class InviteRepository:
         return self.session.exec(statement).first()
 
     def get_active_by_container(self, container_id: int) -> List[Invite]:
-        """Get all active invites for a container"""
+        """Get all active, unexpired invites for a container"""
         statement = (
             select(Invite)
             .where(Invite.container_id == container_id)
             .where(Invite.is_active == True)
+            .where(or_(Invite.expires_at == None, Invite.expires_at > datetime.utcnow()))
             .order_by(Invite.created_at.desc())
         )
         return list(self.session.exec(statement).all())
 
-    def create(self, invite_data: InviteCreate, created_by: int, invite_code: str, expires_at: Optional[datetime] = None) -> Invite:
-        """Create a new invite"""
+    def create(self, invite_data: InviteCreate, created_by: int, invite_code: str, expires_at: Optional[datetime] = None) -> Optional[Invite]:
+        """
+        Create a new invite
+        Returns None if invite_code is already taken (unique index violation)
+        """
         invite = Invite(
             container_id=invite_data.container_id,
             invite_code=invite_code,
@@ -40,27 +45,36 @@ class InviteRepository:
             current_uses=0,
             is_active=True
         )
-        self.session.add(invite)
-        self.session.commit()
-        self.session.refresh(invite)
-        return invite
-
-    def increment_uses(self, invite_id: int) -> Optional[Invite]:
-        """Increment the current_uses counter"""
-        invite = self.get_by_id(invite_id)
-        if not invite:
+        if not insert_unique(self.session, invite):
             return None
+        return invite
 
-        invite.current_uses += 1
-
-        # Auto-deactivate if max uses reached
-        if invite.max_uses and invite.current_uses >= invite.max_uses:
-            invite.is_active = False
+    def redeem(self, invite_id: int) -> bool:
+        """
+        Count one use of an invite with a single conditional UPDATE
 
-        self.session.add(invite)
-        self.session.commit()
-        self.session.refresh(invite)
-        return invite
+        Only matches while the invite is active, unexpired and under
+        max_uses, so concurrent redemptions can never exceed the limit.
+        Taking the last use also deactivates the invite.
+        """
+        statement = (
+            update(Invite)
+            .where(
+                Invite.invite_id == invite_id,
+                Invite.is_active == True,
+                or_(Invite.max_uses == None, Invite.current_uses < Invite.max_uses),
+                or_(Invite.expires_at == None, Invite.expires_at > datetime.utcnow())
+            )
+            # is_active first: MySQL applies SET assignments left to right
+            .ordered_values(
+                (Invite.is_active, or_(Invite.max_uses == None, Invite.current_uses + 1 < Invite.max_uses)),
+                (Invite.current_uses, Invite.current_uses + 1)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        redeemed = self.session.exec(statement).rowcount == 1
+        commit_or_flush(self.session)
+        return redeemed
 
     def deactivate(self, invite_id: int) -> bool:
         """Deactivate an invite"""
@@ -70,7 +84,7 @@ class InviteRepository:
 
         invite.is_active = False
         self.session.add(invite)
-        self.session.commit()
+        commit_or_flush(self.session)
         return True
 
     def delete(self, invite_id: int) -> bool:
@@ -80,23 +94,19 @@ class InviteRepository:
             return False
 
         self.session.delete(invite)
-        self.session.commit()
+        commit_or_flush(self.session)
         return True
 
-    def cleanup_expired(self):
-        """Deactivate all expired invites"""
-        now = datetime.utcnow()
+    def cleanup_expired(self) -> int:
+        """Deactivate all expired invites with one bulk UPDATE, returning how many"""
         statement = (
-            select(Invite)
+            update(Invite)
             .where(Invite.is_active == True)
             .where(Invite.expires_at != None)
-            .where(Invite.expires_at < now)
+            .where(Invite.expires_at <= datetime.utcnow())
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
         )
-        expired_invites = self.session.exec(statement).all()
-
-        for invite in expired_invites:
-            invite.is_active = False
-            self.session.add(invite)
-
-        self.session.commit()
-        return len(list(expired_invites))
+        deactivated = self.session.exec(statement).rowcount
+        commit_or_flush(self.session)
+        return deactivated
@@ -1,6 +1,8 @@
 from sqlmodel import Session, select
-from typing import Optional, List
+from typing import Optional, List, Dict
 from ..models.media import Media, MediaCreate, MediaUpdate
+from .aggregates import count_rows, count_grouped
+from ..cores.database import commit_or_flush
 
 
 class MediaRepository:
@@ -18,12 +20,22 @@ class MediaRepository:
         statement = select(Media).where(Media.slip_id == slip_id).order_by(Media.created_at)
         return list(self.session.exec(statement).all())
 
+    def get_by_slips(self, slip_ids: List[int]) -> List[Media]:
+        """Get all media for several slips, ordered by slip then creation time"""
+        if not slip_ids:
+            return []
+        statement = (
+            select(Media)
+            .where(Media.slip_id.in_(slip_ids))
+            .order_by(Media.slip_id, Media.created_at, Media.media_id)
+        )
+        return list(self.session.exec(statement).all())
+
     def create(self, media_data: MediaCreate) -> Media:
         """Create new media"""
         media = Media(**media_data.model_dump())
         self.session.add(media)
-        self.session.commit()
-        self.session.refresh(media)
+        commit_or_flush(self.session, media)
         return media
 
     def update(self, media_id: int, media_data: MediaUpdate) -> Optional[Media]:
@@ -37,10 +49,20 @@ class MediaRepository:
             setattr(media, key, value)
 
         self.session.add(media)
-        self.session.commit()
-        self.session.refresh(media)
+        commit_or_flush(self.session, media)
         return media
 
+    def set_renditions(self, media_id: int, renditions: str) -> bool:
+        """Record the rendition list (JSON) of a media item"""
+        media = self.get_by_id(media_id)
+        if not media:
+            return False
+
+        media.renditions = renditions
+        self.session.add(media)
+        commit_or_flush(self.session)
+        return True
+
     def delete(self, media_id: int) -> bool:
         """Delete media"""
         media = self.get_by_id(media_id)
@@ -48,10 +70,13 @@ class MediaRepository:
             return False
 
         self.session.delete(media)
-        self.session.commit()
+        commit_or_flush(self.session)
         return True
 
     def count_by_slip(self, slip_id: int) -> int:
         """Count media for a slip"""
-        statement = select(Media).where(Media.slip_id == slip_id)
-        return len(list(self.session.exec(statement).all()))
+        return count_rows(self.session, Media, Media.slip_id == slip_id)
+
+    def count_by_slips(self, slip_ids: List[int]) -> Dict[int, int]:
+        """Count media for several slips, grouped by slip_id"""
+        return count_grouped(self.session, Media.slip_id, slip_ids)
@@ -1,6 +1,9 @@
-from sqlmodel import Session, select
-from typing import Optional, List
+from sqlmodel import Session, select, update
+from typing import Optional, List, Dict, Tuple
 from ..models.membership import Membership, MembershipCreate, MembershipUpdate
+from ..models.container import Container
+from .aggregates import count_rows, count_grouped
+from ..cores.database import commit_or_flush
 
 
 class MembershipRepository:
@@ -8,6 +11,10 @@ class MembershipRepository:
 
     def __init__(self, session: Session):
         self.session = session
+        # Per-request role lookups, including non-memberships (None). Roles
+        # are not shared across requests: every request re-reads them, so a
+        # removal or demotion takes effect immediately on every worker.
+        self._roles: Dict[Tuple[int, int], Optional[str]] = {}
 
     def get_by_id(self, participant_id: int) -> Optional[Membership]:
         """Get membership by ID"""
@@ -35,8 +42,9 @@ class MembershipRepository:
         """Create a new membership"""
         membership = Membership(**membership_data.model_dump())
         self.session.add(membership)
-        self.session.commit()
-        self.session.refresh(membership)
+        self._adjust_member_count(membership.container_id, 1)
+        commit_or_flush(self.session, membership)
+        self._invalidate(membership.user_id, membership.container_id)
         return membership
 
     def update(self, participant_id: int, membership_data: MembershipUpdate) -> Optional[Membership]:
@@ -50,8 +58,8 @@ class MembershipRepository:
             setattr(membership, key, value)
 
         self.session.add(membership)
-        self.session.commit()
-        self.session.refresh(membership)
+        commit_or_flush(self.session, membership)
+        self._invalidate(membership.user_id, membership.container_id)
         return membership
 
     def delete(self, participant_id: int) -> bool:
@@ -61,14 +69,59 @@ class MembershipRepository:
             return False
 
         self.session.delete(membership)
-        self.session.commit()
+        self._adjust_member_count(membership.container_id, -1)
+        commit_or_flush(self.session)
+        self._invalidate(membership.user_id, membership.container_id)
         return True
 
+    def count_by_container(self, container_id: int) -> int:
+        """Count members of a container"""
+        return count_rows(self.session, Membership, Membership.container_id == container_id)
+
+    def count_by_containers(self, container_ids: List[int]) -> Dict[int, int]:
+        """Count members for several containers, grouped by container_id"""
+        return count_grouped(self.session, Membership.container_id, container_ids)
+
+    def preload_user_memberships(self, user_id: int) -> Dict[int, str]:
+        """
+        Load all of a user's memberships in one query and remember their roles
+
+        Returns container_id -> role.
+        """
+        roles = {m.container_id: m.role for m in self.get_user_containers(user_id)}
+        for container_id, role in roles.items():
+            self._roles[(user_id, container_id)] = role
+        return roles
+
+    def get_role(self, user_id: int, container_id: int) -> Optional[str]:
+        """
+        Get user's role in a container, or None if not a member
+
+        Served from the per-request cache; a miss preloads the user's full
+        membership set so later checks in the request cost no queries.
+        """
+        key = (user_id, container_id)
+        if key not in self._roles:
+            self._roles[key] = self.preload_user_memberships(user_id).get(container_id)
+        return self._roles[key]
+
     def is_member(self, user_id: int, container_id: int) -> bool:
         """Check if user is a member of container"""
-        return self.get_user_membership(user_id, container_id) is not None
+        return self.get_role(user_id, container_id) is not None
 
     def is_admin(self, user_id: int, container_id: int) -> bool:
         """Check if user is admin of container"""
-        membership = self.get_user_membership(user_id, container_id)
-        return membership is not None and membership.role == "admin"
+        return self.get_role(user_id, container_id) == "admin"
+
+    def _adjust_member_count(self, container_id: int, delta: int):
+        """Keep container.member_count in sync, in the same transaction as the membership write"""
+        statement = (
+            update(Container)
+            .where(Container.container_id == container_id)
+            .values(member_count=Container.member_count + delta)
+        )
+        self.session.exec(statement)
+
+    def _invalidate(self, user_id: int, container_id: int):
+        """Drop cached role after a membership write"""
+        self._roles.pop((user_id, container_id), None)
@@ -1,6 +1,25 @@
-from sqlmodel import Session, select
-from typing import Optional, List, Dict
-from ..models.reaction import SlipReaction, ReactionCreate
+from sqlmodel import Session, select, delete, update
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.exc import DBAPIError
+from typing import Optional, List, Dict, NamedTuple, Tuple
+from datetime import datetime
+from ..models.reaction import SlipReaction, SlipReactionCount, ReactionCreate
+from ..models.slip import Slip
+from .aggregates import count_rows, count_grouped
+from ..cores.pagination import after_position
+from ..cores.database import commit_or_flush, in_unit_of_work, is_lock_conflict
+
+
+# Attempts for a toggle that lost a race with the same user's other tap
+TOGGLE_ATTEMPTS = 3
+
+
+class ToggleResult(NamedTuple):
+    """Outcome of ReactionRepository.toggle, with the slip's counts after it"""
+    action: str
+    previous_type: Optional[str]
+    reaction_count: int
+    reaction_summary: Dict[str, int]
 
 
 class ReactionRepository:
@@ -13,13 +32,27 @@ class ReactionRepository:
         """Get reaction by ID"""
         return self.session.get(SlipReaction, slip_reaction_id)
 
-    def get_by_slip(self, slip_id: int) -> List[SlipReaction]:
-        """Get all reactions for a slip"""
-        statement = (
-            select(SlipReaction)
-            .where(SlipReaction.slip_id == slip_id)
-            .order_by(SlipReaction.created_at.desc())
-        )
+    def get_by_slip(
+        self,
+        slip_id: int,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[SlipReaction]:
+        """
+        Get reactions for a slip, newest first
+
+        All reactions are returned unless `limit` is given. Pass `after`
+        (created_at, slip_reaction_id) of the last reaction seen for keyset
+        pagination.
+        """
+        statement = select(SlipReaction).where(SlipReaction.slip_id == slip_id)
+        if after:
+            statement = statement.where(
+                after_position(SlipReaction.created_at, SlipReaction.slip_reaction_id, after)
+            )
+        statement = statement.order_by(SlipReaction.created_at.desc(), SlipReaction.slip_reaction_id.desc())
+        if limit:
+            statement = statement.limit(limit)
         return list(self.session.exec(statement).all())
 
     def get_user_reaction(self, slip_id: int, user_id: int) -> Optional[SlipReaction]:
@@ -45,8 +78,9 @@ class ReactionRepository:
             user_id=user_id
         )
         self.session.add(reaction)
-        self.session.commit()
-        self.session.refresh(reaction)
+        self._adjust_type_count(reaction.slip_id, reaction.reaction_type, 1)
+        self._adjust_total_count(reaction.slip_id, 1)
+        commit_or_flush(self.session, reaction)
         return reaction
 
     def update(self, slip_reaction_id: int, reaction_type: str) -> Optional[SlipReaction]:
@@ -55,10 +89,22 @@ class ReactionRepository:
         if not reaction:
             return None
 
-        reaction.reaction_type = reaction_type
-        self.session.add(reaction)
-        self.session.commit()
-        self.session.refresh(reaction)
+        previous_type = reaction.reaction_type
+        if previous_type != reaction_type:
+            # Conditional on the type read, so the counters move only if this write changed it
+            replaced = self.session.exec(
+                update(SlipReaction)
+                .where(
+                    SlipReaction.slip_reaction_id == slip_reaction_id,
+                    SlipReaction.reaction_type == previous_type
+                )
+                .values(reaction_type=reaction_type)
+            ).rowcount
+            if not replaced:
+                return None
+            self._adjust_type_counts(reaction.slip_id, {previous_type: -1, reaction_type: 1})
+
+        commit_or_flush(self.session, reaction)
         return reaction
 
     def delete(self, slip_reaction_id: int) -> bool:
@@ -67,29 +113,195 @@ class ReactionRepository:
         if not reaction:
             return False
 
-        self.session.delete(reaction)
-        self.session.commit()
+        # The counters follow the DELETE's own rowcount (see toggle)
+        removed = self.session.exec(
+            delete(SlipReaction).where(
+                SlipReaction.slip_reaction_id == slip_reaction_id,
+                SlipReaction.reaction_type == reaction.reaction_type
+            )
+        ).rowcount
+        if not removed:
+            return False
+
+        self._adjust_type_count(reaction.slip_id, reaction.reaction_type, -1)
+        self._adjust_total_count(reaction.slip_id, -1)
+        commit_or_flush(self.session)
         return True
 
     def delete_user_reaction(self, slip_id: int, user_id: int) -> bool:
         """Delete user's reaction on a slip"""
+        # Conditional on the type read, like toggle()'s writes, so a concurrent toggle
+        # can't make both decrement the counters
         reaction = self.get_user_reaction(slip_id, user_id)
         if not reaction:
             return False
 
-        self.session.delete(reaction)
-        self.session.commit()
+        removed = self.session.exec(
+            delete(SlipReaction)
+            .where(
+                SlipReaction.slip_id == slip_id,
+                SlipReaction.user_id == user_id,
+                SlipReaction.reaction_type == reaction.reaction_type
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not removed:
+            return False
+
+        self._adjust_type_count(slip_id, reaction.reaction_type, -1)
+        self._adjust_total_count(slip_id, -1)
+        commit_or_flush(self.session)
         return True
 
+    def toggle(self, slip_id: int, user_id: int, reaction_type: str) -> Optional[ToggleResult]:
+        """
+        Toggle a user's reaction on a slip; returns the action and the slip's counts after it
+
+        - None: INSERT IGNORE on the unique (slip_id, user_id) key -> "added"
+        - Same type present: conditional DELETE -> "removed"
+        - Other type present: conditional UPDATE -> "updated"
+
+        Adding and removing each take one write on the reaction row. Only a
+        switch reads the type it replaces, because its counter has to go
+        down. Every write is conditional and the counter deltas follow the
+        rows it actually changed. No locking read is used, so first taps
+        from different users take no gap locks and never block each other.
+        If the same user taps again at the same moment, the write changes
+        0 rows or deadlocks. That attempt is rolled back and retried.
+
+        Returns None if every attempt lost, or at once inside unit_of_work(),
+        where the caller's transaction can't be retried from here.
+        """
+        for attempt in range(1, TOGGLE_ATTEMPTS + 1):
+            try:
+                outcome = self._toggle_once(slip_id, user_id, reaction_type)
+                if outcome is not None:
+                    # Same transaction: our counter rows are still locked, so they are exact
+                    reaction_count, reaction_summary = self._read_counts(slip_id)
+            except DBAPIError as e:
+                if not is_lock_conflict(e) or in_unit_of_work(self.session) or attempt == TOGGLE_ATTEMPTS:
+                    raise
+                outcome = None
+
+            if outcome is not None:
+                commit_or_flush(self.session)
+                return ToggleResult(*outcome, reaction_count, reaction_summary)
+            if in_unit_of_work(self.session):
+                return None
+            self.session.rollback()
+        return None
+
+    def _toggle_once(self, slip_id: int, user_id: int, reaction_type: str) -> Optional[Tuple[str, Optional[str]]]:
+        """One toggle attempt (see toggle); (action, previous type), or None if it lost a race"""
+        is_users_reaction = (SlipReaction.slip_id == slip_id, SlipReaction.user_id == user_id)
+
+        # IGNORE leaves an existing row alone and reports 0 rows
+        added = self.session.exec(
+            insert(SlipReaction)
+            .values(slip_id=slip_id, user_id=user_id, reaction_type=reaction_type, created_at=datetime.utcnow())
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite")
+        ).rowcount
+        if added:
+            self._adjust_type_counts(slip_id, {reaction_type: 1})
+            self._adjust_total_count(slip_id, 1)
+            return "added", None
+
+        removed = self.session.exec(
+            delete(SlipReaction)
+            .where(*is_users_reaction, SlipReaction.reaction_type == reaction_type)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if removed:
+            self._adjust_type_counts(slip_id, {reaction_type: -1})
+            self._adjust_total_count(slip_id, -1)
+            return "removed", reaction_type
+
+        current = self.session.exec(select(SlipReaction.reaction_type).where(*is_users_reaction)).first()
+        if current is None or current == reaction_type:
+            return None
+        replaced = self.session.exec(
+            update(SlipReaction)
+            .where(*is_users_reaction, SlipReaction.reaction_type == current)
+            .values(reaction_type=reaction_type)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not replaced:
+            return None
+        self._adjust_type_counts(slip_id, {current: -1, reaction_type: 1})
+        return "updated", current
+
+    def _read_counts(self, slip_id: int) -> Tuple[int, Dict[str, int]]:
+        """slip.reaction_count and the per-type counts (most used first) in one query"""
+        rows = self.session.exec(
+            select(Slip.reaction_count, SlipReactionCount.reaction_type, SlipReactionCount.count)
+            .select_from(Slip)
+            .outerjoin(
+                SlipReactionCount,
+                (SlipReactionCount.slip_id == Slip.slip_id) & (SlipReactionCount.count > 0)
+            )
+            .where(Slip.slip_id == slip_id)
+            .order_by(SlipReactionCount.count.desc(), SlipReactionCount.reaction_type)
+        ).all()
+        reaction_count = rows[0][0] if rows else 0
+        return reaction_count, {reaction_type: count for _, reaction_type, count in rows if reaction_type}
+
     def count_by_slip(self, slip_id: int) -> int:
         """Count total reactions on a slip"""
-        statement = select(SlipReaction).where(SlipReaction.slip_id == slip_id)
-        return len(list(self.session.exec(statement).all()))
+        return count_rows(self.session, SlipReaction, SlipReaction.slip_id == slip_id)
+
+    def count_by_slips(self, slip_ids: List[int]) -> Dict[int, int]:
+        """Count total reactions for several slips, grouped by slip_id"""
+        return count_grouped(self.session, SlipReaction.slip_id, slip_ids)
 
     def get_reaction_summary(self, slip_id: int) -> Dict[str, int]:
         """Get reaction count grouped by type"""
-        reactions = self.get_by_slip(slip_id)
-        summary = {}
-        for reaction in reactions:
-            summary[reaction.reaction_type] = summary.get(reaction.reaction_type, 0) + 1
-        return summary
+        return self.get_reaction_summaries([slip_id]).get(slip_id, {})
+
+    def get_reaction_summaries(self, slip_ids: List[int]) -> Dict[int, Dict[str, int]]:
+        """
+        Get reaction counts grouped by type for several slips in one query
+
+        Reads the denormalised slipreactioncount rows, so the cost does not
+        grow with the number of reactions. Types are ordered by count, most
+        used first.
+        """
+        if not slip_ids:
+            return {}
+        statement = (
+            select(SlipReactionCount)
+            .where(SlipReactionCount.slip_id.in_(slip_ids), SlipReactionCount.count > 0)
+            .order_by(
+                SlipReactionCount.slip_id,
+                SlipReactionCount.count.desc(),
+                SlipReactionCount.reaction_type
+            )
+        )
+        summaries: Dict[int, Dict[str, int]] = {}
+        for row in self.session.exec(statement).all():
+            summaries.setdefault(row.slip_id, {})[row.reaction_type] = row.count
+        return summaries
+
+    def _adjust_type_count(self, slip_id: int, reaction_type: str, delta: int):
+        """Keep slipreactioncount in sync, creating the row on first use"""
+        statement = insert(SlipReactionCount).values(
+            slip_id=slip_id,
+            reaction_type=reaction_type,
+            count=max(delta, 0)
+        )
+        statement = statement.on_duplicate_key_update(count=SlipReactionCount.count + delta)
+        self.session.exec(statement)
+
+    def _adjust_type_counts(self, slip_id: int, deltas: Dict[str, int]):
+        """Adjust several types' counts, locking their rows in a fixed order to avoid deadlocks"""
+        for reaction_type in sorted(deltas):
+            self._adjust_type_count(slip_id, reaction_type, deltas[reaction_type])
+
+    def _adjust_total_count(self, slip_id: int, delta: int):
+        """Keep slip.reaction_count in sync, in the same transaction as the reaction write"""
+        statement = (
+            update(Slip)
+            .where(Slip.slip_id == slip_id)
+            .values(reaction_count=Slip.reaction_count + delta)
+        )
+        self.session.exec(statement)
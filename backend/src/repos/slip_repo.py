@@ -1,6 +1,18 @@
-from sqlmodel import Session, select
-from typing import Optional, List
+from sqlmodel import Session, select, func, update, insert
+from sqlalchemy import exists
+from typing import Optional, List, Dict, Tuple
+from datetime import datetime
 from ..models.slip import Slip, SlipCreate, SlipUpdate
+from ..models.membership import Membership
+from ..models.comment import Comment
+from ..models.reaction import SlipReaction, SlipReactionCount
+from .aggregates import count_rows, count_grouped
+from ..cores.pagination import after_position
+from ..cores.database import commit_or_flush
+
+
+# Slips per reconcile_counters transaction
+RECONCILE_BATCH_SIZE = 500
 
 
 class SlipRepository:
@@ -18,26 +30,75 @@ class SlipRepository:
         statement = select(Slip).offset(skip).limit(limit).order_by(Slip.created_at.desc())
         return list(self.session.exec(statement).all())
 
-    def get_by_container(self, container_id: int, skip: int = 0, limit: int = 100) -> List[Slip]:
-        """Get all slips in a container"""
-        statement = (
-            select(Slip)
-            .where(Slip.container_id == container_id)
-            .order_by(Slip.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-        )
+    def get_by_container(
+        self,
+        container_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Slip]:
+        """
+        Get all slips in a container, newest first
+
+        Pass `after` (created_at, slip_id) of the last slip seen for keyset
+        pagination; `skip` is then ignored.
+        """
+        statement = select(Slip).where(Slip.container_id == container_id)
+        if after:
+            statement = statement.where(after_position(Slip.created_at, Slip.slip_id, after))
+        else:
+            statement = statement.offset(skip)
+        statement = statement.order_by(Slip.created_at.desc(), Slip.slip_id.desc()).limit(limit)
+        return list(self.session.exec(statement).all())
+
+    def get_by_author(
+        self,
+        author_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Slip]:
+        """
+        Get all slips by an author, newest first
+
+        Pass `after` (created_at, slip_id) of the last slip seen for keyset
+        pagination; `skip` is then ignored.
+        """
+        statement = select(Slip).where(Slip.author_id == author_id)
+        if after:
+            statement = statement.where(after_position(Slip.created_at, Slip.slip_id, after))
+        else:
+            statement = statement.offset(skip)
+        statement = statement.order_by(Slip.created_at.desc(), Slip.slip_id.desc()).limit(limit)
         return list(self.session.exec(statement).all())
 
-    def get_by_author(self, author_id: int, skip: int = 0, limit: int = 100) -> List[Slip]:
-        """Get all slips by an author"""
-        statement = (
-            select(Slip)
-            .where(Slip.author_id == author_id)
-            .order_by(Slip.created_at.desc())
-            .offset(skip)
-            .limit(limit)
+    def get_visible_by_author(
+        self,
+        author_id: int,
+        viewer_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Slip]:
+        """
+        Get slips by an author in containers the viewer is a member of, newest first
+
+        Visibility is filtered in SQL with EXISTS on the viewer's membership,
+        so every page is full and a duplicate membership row can't repeat a
+        slip. Pass `after` (created_at, slip_id) for keyset pagination.
+        """
+        viewer_is_member = exists(
+            select(Membership.participant_id).where(
+                Membership.container_id == Slip.container_id,
+                Membership.user_id == viewer_id
+            )
         )
+        statement = select(Slip).where(Slip.author_id == author_id, viewer_is_member)
+        if after:
+            statement = statement.where(after_position(Slip.created_at, Slip.slip_id, after))
+        else:
+            statement = statement.offset(skip)
+        statement = statement.order_by(Slip.created_at.desc(), Slip.slip_id.desc()).limit(limit)
         return list(self.session.exec(statement).all())
 
     def create(self, slip_data: SlipCreate, author_id: int) -> Slip:
@@ -47,8 +108,7 @@ class SlipRepository:
             author_id=author_id
         )
         self.session.add(slip)
-        self.session.commit()
-        self.session.refresh(slip)
+        commit_or_flush(self.session, slip)
         return slip
 
     def update(self, slip_id: int, slip_data: SlipUpdate) -> Optional[Slip]:
@@ -62,8 +122,7 @@ class SlipRepository:
             setattr(slip, key, value)
 
         self.session.add(slip)
-        self.session.commit()
-        self.session.refresh(slip)
+        commit_or_flush(self.session, slip)
         return slip
 
     def delete(self, slip_id: int) -> bool:
@@ -73,10 +132,102 @@ class SlipRepository:
             return False
 
         self.session.delete(slip)
-        self.session.commit()
+        commit_or_flush(self.session)
         return True
 
     def count_by_container(self, container_id: int) -> int:
         """Count slips in a container"""
-        statement = select(Slip).where(Slip.container_id == container_id)
-        return len(list(self.session.exec(statement).all()))
+        return count_rows(self.session, Slip, Slip.container_id == container_id)
+
+    def count_by_containers(self, container_ids: List[int]) -> Dict[int, int]:
+        """Count slips for several containers, grouped by container_id"""
+        return count_grouped(self.session, Slip.container_id, container_ids)
+
+    def reconcile_counters(self, slip_ids: Optional[List[int]] = None, batch_size: int = RECONCILE_BATCH_SIZE) -> int:
+        """
+        Rebuild the denormalised comment/reaction counters from source rows
+
+        Walks all slips (or only `slip_ids`) in batches of `batch_size` by
+        slip_id, committing after each, so a run only ever locks one batch's
+        counter rows. Only counters that differ are written. Returns how many
+        slips had drifted totals.
+        """
+        drifted = 0
+        if slip_ids is not None:
+            for i in range(0, len(slip_ids), batch_size):
+                drifted += self._reconcile_batch(slip_ids[i:i + batch_size])
+            return drifted
+
+        last_id = 0
+        while True:
+            batch = self.session.exec(
+                select(Slip.slip_id).where(Slip.slip_id > last_id).order_by(Slip.slip_id).limit(batch_size)
+            ).all()
+            if not batch:
+                return drifted
+            drifted += self._reconcile_batch(list(batch))
+            last_id = batch[-1]
+
+    def _reconcile_batch(self, slip_ids: List[int]) -> int:
+        """Fix one batch's counters in its own short transaction; returns drifted slips"""
+        comment_count = (
+            select(func.count())
+            .select_from(Comment)
+            .where(Comment.slip_id == Slip.slip_id)
+            .scalar_subquery()
+        )
+        reaction_count = (
+            select(func.count())
+            .select_from(SlipReaction)
+            .where(SlipReaction.slip_id == Slip.slip_id)
+            .scalar_subquery()
+        )
+        type_count = (
+            select(func.count())
+            .select_from(SlipReaction)
+            .where(
+                SlipReaction.slip_id == SlipReactionCount.slip_id,
+                SlipReaction.reaction_type == SlipReactionCount.reaction_type
+            )
+            .scalar_subquery()
+        )
+
+        # Fix drifted totals on slip
+        fix_totals = (
+            update(Slip)
+            .where(Slip.slip_id.in_(slip_ids))
+            .where((Slip.comment_count != comment_count) | (Slip.reaction_count != reaction_count))
+            .values(comment_count=comment_count, reaction_count=reaction_count)
+            .execution_options(synchronize_session=False)
+        )
+        # Fix drifted per-type rows in place (types with no reactions left go to 0)
+        fix_types = (
+            update(SlipReactionCount)
+            .where(SlipReactionCount.slip_id.in_(slip_ids))
+            .where(SlipReactionCount.count != type_count)
+            .values(count=type_count)
+            .execution_options(synchronize_session=False)
+        )
+        # Add rows for types that have reactions but no counter row; a toggle
+        # that creates the row concurrently wins (IGNORE)
+        missing_types = (
+            select(SlipReaction.slip_id, SlipReaction.reaction_type, func.count())
+            .where(SlipReaction.slip_id.in_(slip_ids))
+            .where(~exists().where(
+                SlipReactionCount.slip_id == SlipReaction.slip_id,
+                SlipReactionCount.reaction_type == SlipReaction.reaction_type
+            ))
+            .group_by(SlipReaction.slip_id, SlipReaction.reaction_type)
+        )
+        add_types = (
+            insert(SlipReactionCount)
+            .from_select(["slip_id", "reaction_type", "count"], missing_types)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite")
+        )
+
+        drifted = self.session.exec(fix_totals).rowcount
+        self.session.exec(fix_types)
+        self.session.exec(add_types)
+        commit_or_flush(self.session)
+        return drifted
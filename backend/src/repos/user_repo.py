@@ -1,6 +1,24 @@
-from sqlmodel import Session, select
-from typing import Optional
+from sqlmodel import Session, select, func, case, cast, Integer, String
+from typing import Optional, List, Dict, Set, Iterable, NamedTuple
 from ..models.user import User, UserCreate
+from ..cores.cache import TTLCache
+from ..cores.config import settings
+from ..cores.database import commit_or_flush, after_commit, insert_unique
+
+
+class UserProfile(NamedTuple):
+    """Slim user info needed to render authors in responses"""
+    user_id: int
+    username: str
+    email: str
+    profile_picture_url: Optional[str]
+
+
+# Cross-request LRU of user_id -> UserProfile
+user_profile_cache = TTLCache(
+    maxsize=settings.USER_PROFILE_CACHE_SIZE,
+    ttl=settings.USER_PROFILE_CACHE_TTL
+)
 
 
 class UserRepository:
@@ -16,6 +34,13 @@ class UserRepository:
         """Get user by ID"""
         return self.session.get(User, user_id)
 
+    def get_many(self, user_ids: List[int]) -> List[User]:
+        """Get users by a list of IDs in a single query"""
+        if not user_ids:
+            return []
+        statement = select(User).where(User.user_id.in_(set(user_ids)))
+        return list(self.session.exec(statement).all())
+
     def get_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
         statement = select(User).where(User.email == email)
@@ -35,15 +60,25 @@ class UserRepository:
         """Create a new user"""
         user = User(**user_data.model_dump())
         self.session.add(user)
-        self.session.commit()
-        self.session.refresh(user)
+        commit_or_flush(self.session, user)
+        return user
+
+    def create_unique(self, user_data: UserCreate) -> Optional[User]:
+        """
+        Create a new user
+        Returns None if the username is taken; a taken email or firebase_uid
+        raises IntegrityError (the session is rolled back)
+        """
+        user = User(**user_data.model_dump())
+        if not insert_unique(self.session, user, columns=("username",)):
+            return None
         return user
 
     def update(self, user: User) -> User:
         """Update user"""
         self.session.add(user)
-        self.session.commit()
-        self.session.refresh(user)
+        commit_or_flush(self.session, user)
+        after_commit(self.session, lambda: user_profile_cache.pop(user.user_id))
         return user
 
     def delete(self, user_id: int) -> bool:
@@ -51,7 +86,8 @@ class UserRepository:
         user = self.get_by_id(user_id)
         if user:
             self.session.delete(user)
-            self.session.commit()
+            commit_or_flush(self.session)
+            after_commit(self.session, lambda: user_profile_cache.pop(user_id))
             return True
         return False
 
@@ -62,3 +98,74 @@ class UserRepository:
     def username_exists(self, username: str) -> bool:
         """Check if username already exists"""
         return self.get_by_username(username) is not None
+
+    def next_free_username(self, base: str) -> str:
+        """
+        Return base if unused, else base followed by 1 + the highest numeric suffix in use
+
+        One aggregate query over usernames LIKE 'base%'. A suffix only counts
+        if it is a plain number (casting it to an integer and back gives it back),
+        so "alice_x" or "alice007" never affect "alice"'s next number.
+        """
+        pattern = base.replace("/", "//").replace("%", "/%").replace("_", "/_") + "%"
+        suffix = func.substr(User.username, len(base) + 1)
+        number = cast(suffix, Integer)
+        statement = select(
+            func.max(case((User.username == base, 1), else_=0)),
+            func.max(case((cast(number, String) == suffix, number), else_=None))
+        ).where(User.username.like(pattern, escape="/"))
+        taken, highest = self.session.exec(statement).one()
+
+        if not taken:
+            return base
+        return f"{base}{max(highest or 0, 0) + 1}"
+
+
+class UserLoader:
+    """
+    Request-scoped batch loader for user profiles (DataLoader style)
+
+    prime() collects the user IDs a response needs; the first get() resolves
+    all pending IDs at once - from the shared profile cache, then with a
+    single IN query for the rest. Each ID is resolved at most once per request.
+    """
+
+    def __init__(self, user_repo: UserRepository):
+        self.user_repo = user_repo
+        self._profiles: Dict[int, Optional[UserProfile]] = {}
+        self._pending: Set[int] = set()
+
+    def prime(self, user_ids: Iterable[int]):
+        """Queue user IDs to be loaded with the next batch"""
+        self._pending.update(uid for uid in user_ids if uid not in self._profiles)
+
+    def get(self, user_id: int) -> Optional[UserProfile]:
+        """Get a user profile, loading all pending IDs if needed"""
+        if user_id not in self._profiles:
+            self._pending.add(user_id)
+            self._load_pending()
+        return self._profiles.get(user_id)
+
+    def _load_pending(self):
+        pending, self._pending = self._pending, set()
+
+        missing = []
+        for user_id in pending:
+            profile = user_profile_cache.get(user_id)
+            if profile is None:
+                missing.append(user_id)
+            else:
+                self._profiles[user_id] = profile
+
+        for user in self.user_repo.get_many(missing):
+            profile = UserProfile(
+                user_id=user.user_id,
+                username=user.username,
+                email=user.email,
+                profile_picture_url=user.profile_picture_url
+            )
+            self._profiles[user.user_id] = profile
+            user_profile_cache.set(user.user_id, profile)
+
+        for user_id in missing:
+            self._profiles.setdefault(user_id, None)
@@ -1,4 +1,5 @@
 from sqlmodel import Session
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from typing import Optional
 from ..models.user import User, UserCreate, UserResponse, AuthResponse
@@ -7,6 +8,10 @@ from ..cores.security import create_access_token
 from ..cores.firebase_config import verify_firebase_token, get_firebase_user
 
 
+# Signup attempts before giving up on a generated username (lost races only)
+USERNAME_ATTEMPTS = 5
+
+
 class AuthService:
     """
     Authentication service - All auth is handled by Firebase
@@ -27,7 +32,7 @@ class AuthService:
         - Facebook, Twitter, etc.
 
         Flow:
-        1. Verify Firebase token with Firebase Admin SDK
+        1. Verify Firebase token locally against Google's cached public keys
         2. Extract user info (uid, email) from token
         3. Check if user exists in our database
         4. Create new user if first time login
@@ -51,33 +56,32 @@ class AuthService:
 
             if not user:
                 # 3. First time login - create new user
-                # Get additional info from Firebase
-                try:
-                    firebase_user = get_firebase_user(firebase_uid)
-                    display_name = firebase_user.display_name if hasattr(firebase_user, 'display_name') else None
-                    photo_url = firebase_user.photo_url if hasattr(firebase_user, 'photo_url') else None
-                except:
-                    display_name = None
-                    photo_url = None
-
-                # Generate username from email or provided username
-                if not username:
-                    username = email.split("@")[0]
-                    # Ensure username is unique
-                    base_username = username
-                    counter = 1
-                    while self.user_repo.username_exists(username):
-                        username = f"{base_username}{counter}"
-                        counter += 1
+                # Profile info comes from the token claims; only ask Firebase
+                # (a network call) when the token doesn't carry it
+                display_name = decoded_token.get("name")
+                photo_url = decoded_token.get("picture")
+                if "name" not in decoded_token or "picture" not in decoded_token:
+                    try:
+                        firebase_user = get_firebase_user(firebase_uid)
+                        display_name = firebase_user.display_name if hasattr(firebase_user, 'display_name') else None
+                        photo_url = firebase_user.photo_url if hasattr(firebase_user, 'photo_url') else None
+                    except:
+                        display_name = None
+                        photo_url = None
 
                 # Create user
-                user_data = UserCreate(
-                    username=username,
-                    email=email,
-                    firebase_uid=firebase_uid,
-                    profile_picture_url=photo_url
-                )
-                user = self.user_repo.create(user_data)
+                try:
+                    if username:
+                        user = self.user_repo.create(UserCreate(
+                            username=username,
+                            email=email,
+                            firebase_uid=firebase_uid,
+                            profile_picture_url=photo_url
+                        ))
+                    else:
+                        user = self._create_with_generated_username(email, firebase_uid, photo_url)
+                except IntegrityError:
+                    user = self._get_concurrently_created(firebase_uid)
 
             # 4. Create JWT access token for API
             access_token = create_access_token(data={"sub": str(user.user_id)})
@@ -101,6 +105,48 @@ class AuthService:
                 detail=f"Authentication failed: {str(e)}"
             )
 
+    def _create_with_generated_username(self, email: str, firebase_uid: str, photo_url: Optional[str]) -> User:
+        """
+        Create a user named after the email prefix (alice, alice1, alice2, ...)
+
+        The next free name comes from one query; the unique index settles
+        races with a concurrent signup, in which case the name is recomputed.
+        Duplicates on email or firebase_uid are not retried: they raise
+        IntegrityError.
+        """
+        base_username = email.split("@")[0]
+        for _ in range(USERNAME_ATTEMPTS):
+            user = self.user_repo.create_unique(UserCreate(
+                username=self.user_repo.next_free_username(base_username),
+                email=email,
+                firebase_uid=firebase_uid,
+                profile_picture_url=photo_url
+            ))
+            if user:
+                return user
+
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Could not allocate a unique username"
+        )
+
+    def _get_concurrently_created(self, firebase_uid: str) -> User:
+        """
+        User created by a parallel first login with the same Firebase UID
+
+        Called when the signup insert hit a unique key other than a generated
+        username; if nobody else created this user, the username or email
+        belongs to another account.
+        """
+        self.session.rollback()
+        user = self.user_repo.get_by_firebase_uid(firebase_uid)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Username or email is already registered to another account"
+            )
+        return user
+
     def get_current_user(self, user_id: int) -> UserResponse:
         """Get current user by ID"""
         user = self.user_repo.get_by_id(user_id)
@@ -1,11 +1,12 @@
 from fastapi import HTTPException
-from typing import List
+from typing import List, Optional
 
 from ..repos.comment_repo import CommentRepository
 from ..repos.slip_repo import SlipRepository
 from ..repos.membership_repo import MembershipRepository
-from ..repos.user_repo import UserRepository
+from ..repos.user_repo import UserRepository, UserLoader
 from ..models.comment import CommentCreate, CommentUpdate, CommentResponse, Comment
+from ..cores.pagination import decode_cursor
 
 
 class CommentService:
@@ -22,10 +23,11 @@ class CommentService:
         self.slip_repo = slip_repo
         self.membership_repo = membership_repo
         self.user_repo = user_repo
+        self.user_loader = UserLoader(user_repo)
 
     def _build_comment_response(self, comment: Comment) -> CommentResponse:
         """Build comment response with author info"""
-        author = self.user_repo.get_by_id(comment.author_id)
+        author = self.user_loader.get(comment.author_id)
 
         return CommentResponse(
             comment_id=comment.comment_id,
@@ -45,8 +47,7 @@ class CommentService:
             raise HTTPException(status_code=404, detail="Slip not found")
 
         # Check if user is member of the container
-        membership = self.membership_repo.get_user_membership(user_id, slip.container_id)
-        if not membership:
+        if not self.membership_repo.is_member(user_id, slip.container_id):
             raise HTTPException(status_code=403, detail="You don't have access to this slip")
 
         return slip
@@ -64,17 +65,28 @@ class CommentService:
 
         return self._build_comment_response(comment)
 
-    def get_slip_comments(self, slip_id: int, user_id: int, skip: int = 0, limit: int = 100) -> List[CommentResponse]:
+    def get_slip_comments(
+        self,
+        slip_id: int,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[CommentResponse]:
         """
         Get all comments for a slip
         Only container members can view comments
+        Pages by cursor when given, otherwise by skip/limit
         """
         # Check access
         self._check_slip_access(slip_id, user_id)
 
         # Get comments
-        comments = self.comment_repo.get_by_slip(slip_id, skip, limit)
+        after = decode_cursor(cursor) if cursor else None
+        comments = self.comment_repo.get_by_slip(slip_id, skip, limit, after=after)
 
+        # Resolve all authors with one query
+        self.user_loader.prime(comment.author_id for comment in comments)
         return [self._build_comment_response(comment) for comment in comments]
 
     def get_comment(self, comment_id: int, user_id: int) -> CommentResponse:
@@ -126,12 +138,12 @@ class CommentService:
             raise HTTPException(status_code=404, detail="Slip not found")
 
         # Check if user is author or container admin
-        membership = self.membership_repo.get_user_membership(user_id, slip.container_id)
-        if not membership:
+        role = self.membership_repo.get_role(user_id, slip.container_id)
+        if not role:
             raise HTTPException(status_code=403, detail="You don't have access to this container")
 
         is_author = comment.author_id == user_id
-        is_admin = membership.role == "admin"
+        is_admin = role == "admin"
 
         if not (is_author or is_admin):
             raise HTTPException(status_code=403, detail="Only comment author or container admin can delete comments")
@@ -6,7 +6,8 @@ from ..models.container import Container, ContainerCreate, ContainerUpdate, Cont
 from ..models.membership import MembershipCreate, MemberRole
 from ..repos.container_repo import ContainerRepository
 from ..repos.membership_repo import MembershipRepository
-from ..repos.user_repo import UserRepository
+from ..repos.user_repo import UserRepository, UserLoader
+from ..cores.database import unit_of_work
 
 
 class ContainerService:
@@ -17,33 +18,36 @@ class ContainerService:
         self.container_repo = ContainerRepository(session)
         self.membership_repo = MembershipRepository(session)
         self.user_repo = UserRepository(session)
+        self.user_loader = UserLoader(self.user_repo)
 
     def create_container(self, container_data: ContainerCreate, owner_id: int) -> ContainerResponse:
         """
         Create a new container
         - Creates the container
         - Automatically adds creator as admin member
+        - Both rows are committed together
         """
-        # Create container
-        container = self.container_repo.create(container_data, owner_id)
-
-        # Add creator as admin
-        membership_data = MembershipCreate(
-            user_id=owner_id,
-            container_id=container.container_id,
-            role=MemberRole.ADMIN.value
-        )
-        self.membership_repo.create(membership_data)
-
-        return ContainerResponse(
-            container_id=container.container_id,
-            name=container.name,
-            owner_id=container.owner_id,
-            jar_style_settings=container.jar_style_settings,
-            created_at=container.created_at,
-            user_role=MemberRole.ADMIN.value,
-            member_count=1
-        )
+        with unit_of_work(self.session):
+            # Create container
+            container = self.container_repo.create(container_data, owner_id)
+
+            # Add creator as admin
+            membership_data = MembershipCreate(
+                user_id=owner_id,
+                container_id=container.container_id,
+                role=MemberRole.ADMIN.value
+            )
+            self.membership_repo.create(membership_data)
+
+            return ContainerResponse(
+                container_id=container.container_id,
+                name=container.name,
+                owner_id=container.owner_id,
+                jar_style_settings=container.jar_style_settings,
+                created_at=container.created_at,
+                user_role=MemberRole.ADMIN.value,
+                member_count=1
+            )
 
     def get_container(self, container_id: int, user_id: int) -> ContainerDetailResponse:
         """
@@ -58,8 +62,8 @@ class ContainerService:
             )
 
         # Check access
-        membership = self.membership_repo.get_user_membership(user_id, container_id)
-        if not membership:
+        role = self.membership_repo.get_role(user_id, container_id)
+        if not role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have access to this container"
@@ -68,10 +72,11 @@ class ContainerService:
         # Get all members
         memberships = self.membership_repo.get_container_members(container_id)
 
-        # Build member info list
+        # Build member info list (users resolved with one query)
+        self.user_loader.prime(m.user_id for m in memberships)
         member_info_list = []
         for m in memberships:
-            user = self.user_repo.get_by_id(m.user_id)
+            user = self.user_loader.get(m.user_id)
             if user:
                 member_info_list.append(
                     MemberInfo(
@@ -90,33 +95,27 @@ class ContainerService:
             owner_id=container.owner_id,
             jar_style_settings=container.jar_style_settings,
             created_at=container.created_at,
-            user_role=membership.role,
+            user_role=role,
             member_count=len(memberships),
             members=member_info_list
         )
 
     def get_user_containers(self, user_id: int) -> List[ContainerResponse]:
-        """Get all containers user is member of"""
-        memberships = self.membership_repo.get_user_containers(user_id)
-
-        containers = []
-        for membership in memberships:
-            container = self.container_repo.get_by_id(membership.container_id)
-            if container:
-                members = self.membership_repo.get_container_members(container.container_id)
-                containers.append(
-                    ContainerResponse(
-                        container_id=container.container_id,
-                        name=container.name,
-                        owner_id=container.owner_id,
-                        jar_style_settings=container.jar_style_settings,
-                        created_at=container.created_at,
-                        user_role=membership.role,
-                        member_count=len(members)
-                    )
-                )
-
-        return containers
+        """Get all containers user is member of (single query)"""
+        rows = self.container_repo.get_user_containers_with_role(user_id)
+
+        return [
+            ContainerResponse(
+                container_id=container.container_id,
+                name=container.name,
+                owner_id=container.owner_id,
+                jar_style_settings=container.jar_style_settings,
+                created_at=container.created_at,
+                user_role=role,
+                member_count=member_count
+            )
+            for container, role, member_count in rows
+        ]
 
     def update_container(
         self,
@@ -142,17 +141,14 @@ class ContainerService:
                 detail="Container not found"
             )
 
-        members = self.membership_repo.get_container_members(container_id)
-        membership = self.membership_repo.get_user_membership(user_id, container_id)
-
         return ContainerResponse(
             container_id=container.container_id,
             name=container.name,
             owner_id=container.owner_id,
             jar_style_settings=container.jar_style_settings,
             created_at=container.created_at,
-            user_role=membership.role if membership else None,
-            member_count=len(members)
+            user_role=MemberRole.ADMIN.value,
+            member_count=self.membership_repo.count_by_container(container_id)
         )
 
     def delete_container(self, container_id: int, user_id: int) -> dict:
@@ -1,5 +1,8 @@
 from datetime import datetime, timedelta
 from fastapi import HTTPException
+from sqlmodel import Session
+import asyncio
+import anyio.to_thread
 import secrets
 import string
 from typing import Optional
@@ -9,6 +12,15 @@ from ..repos.membership_repo import MembershipRepository
 from ..repos.container_repo import ContainerRepository
 from ..models.invite import InviteCreate, InviteResponse, Invite
 from ..models.membership import MembershipCreate
+from ..cores.database import engine, unit_of_work
+
+
+# Exclude similar looking characters: 0, O, I, 1 (32 symbols, 32^8 codes)
+INVITE_CODE_ALPHABET = ''.join(
+    c for c in string.ascii_uppercase + string.digits if c not in "0OI1"
+)
+# Attempts before giving up; a collision is already ~1e-6 likely at 1M invites
+INVITE_CODE_ATTEMPTS = 5
 
 
 class InviteService:
@@ -25,17 +37,11 @@ class InviteService:
         self.container_repo = container_repo
 
     def _generate_invite_code(self, length: int = 8) -> str:
-        """Generate a random invite code"""
-        characters = string.ascii_uppercase + string.digits
-        # Exclude similar looking characters: 0, O, I, 1
-        characters = characters.replace('0', '').replace('O', '').replace('I', '').replace('1', '')
-
-        while True:
-            code = ''.join(secrets.choice(characters) for _ in range(length))
-            # Check if code already exists
-            existing = self.invite_repo.get_by_code(code)
-            if not existing:
-                return code
+        """
+        Generate a random invite code
+        Uniqueness is enforced by the unique index on insert, not by probing
+        """
+        return ''.join(secrets.choice(INVITE_CODE_ALPHABET) for _ in range(length))
 
     def _build_invite_response(self, invite: Invite, base_url: str = "http://localhost:8000") -> InviteResponse:
         """Build invite response with full link"""
@@ -63,28 +69,30 @@ class InviteService:
         Only container admins can create invites
         """
         # Check if user is admin of the container
-        membership = self.membership_repo.get_user_membership(user_id, invite_data.container_id)
-        if not membership:
+        role = self.membership_repo.get_role(user_id, invite_data.container_id)
+        if not role:
             raise HTTPException(status_code=403, detail="You don't have access to this container")
 
-        if membership.role != "admin":
+        if role != "admin":
             raise HTTPException(status_code=403, detail="Only admins can create invites")
 
-        # Generate invite code
-        invite_code = self._generate_invite_code()
-
         # Calculate expiration
         expires_at = None
         if invite_data.expires_in_hours:
             expires_at = datetime.utcnow() + timedelta(hours=invite_data.expires_in_hours)
 
-        # Create invite
-        invite = self.invite_repo.create(
-            invite_data=invite_data,
-            created_by=user_id,
-            invite_code=invite_code,
-            expires_at=expires_at
-        )
+        # Create invite, retrying with a fresh code on the rare collision
+        for _ in range(INVITE_CODE_ATTEMPTS):
+            invite = self.invite_repo.create(
+                invite_data=invite_data,
+                created_by=user_id,
+                invite_code=self._generate_invite_code(),
+                expires_at=expires_at
+            )
+            if invite:
+                break
+        else:
+            raise HTTPException(status_code=500, detail="Could not generate a unique invite code")
 
         return self._build_invite_response(invite, base_url)
 
@@ -94,74 +102,71 @@ class InviteService:
         Only admins can view invites
         """
         # Check if user is admin
-        membership = self.membership_repo.get_user_membership(user_id, container_id)
-        if not membership:
+        role = self.membership_repo.get_role(user_id, container_id)
+        if not role:
             raise HTTPException(status_code=403, detail="You don't have access to this container")
 
-        if membership.role != "admin":
+        if role != "admin":
             raise HTTPException(status_code=403, detail="Only admins can view invites")
 
-        # Cleanup expired invites first
-        self.invite_repo.cleanup_expired()
-
-        # Get active invites
+        # Get active invites (expired ones are filtered out by the query)
         invites = self.invite_repo.get_active_by_container(container_id)
         return [self._build_invite_response(invite, base_url) for invite in invites]
 
     def join_by_code(self, invite_code: str, user_id: int) -> dict:
         """
         Join a container using an invite code
+        - The use is counted by one conditional UPDATE, committed together
+          with the membership, so a limited invite never over-admits
         """
         # Get invite
         invite = self.invite_repo.get_by_code(invite_code)
         if not invite:
             raise HTTPException(status_code=404, detail="Invalid invite code")
 
-        # Check if invite is active
-        if not invite.is_active:
-            raise HTTPException(status_code=400, detail="This invite is no longer active")
-
-        # Check if invite has expired
-        if invite.expires_at and invite.expires_at < datetime.utcnow():
-            # Auto-deactivate
-            self.invite_repo.deactivate(invite.invite_id)
-            raise HTTPException(status_code=400, detail="This invite has expired")
-
-        # Check if max uses reached
-        if invite.max_uses and invite.current_uses >= invite.max_uses:
-            raise HTTPException(status_code=400, detail="This invite has reached its maximum usage limit")
-
         # Check if user is already a member
-        existing_membership = self.membership_repo.get_user_membership(user_id, invite.container_id)
-        if existing_membership:
+        if self.membership_repo.is_member(user_id, invite.container_id):
             raise HTTPException(status_code=400, detail="You are already a member of this container")
 
-        # Add user as member
-        membership_data = MembershipCreate(
-            user_id=user_id,
-            container_id=invite.container_id,
-            role="member"
-        )
-        membership = self.membership_repo.create(membership_data)
+        with unit_of_work(self.invite_repo.session):
+            # Take one use of the invite
+            if not self.invite_repo.redeem(invite.invite_id):
+                raise self._redeem_error(invite)
+
+            # Add user as member
+            membership_data = MembershipCreate(
+                user_id=user_id,
+                container_id=invite.container_id,
+                role="member"
+            )
+            membership = self.membership_repo.create(membership_data)
+
+            # Get container info
+            container = self.container_repo.get_by_id(invite.container_id)
+
+            return {
+                "message": "Successfully joined container",
+                "container": {
+                    "container_id": container.container_id,
+                    "name": container.name
+                },
+                "membership": {
+                    "participant_id": membership.participant_id,
+                    "role": membership.role,
+                    "joined_at": membership.joined_at
+                }
+            }
 
-        # Increment invite uses
-        self.invite_repo.increment_uses(invite.invite_id)
+    def _redeem_error(self, invite: Invite) -> HTTPException:
+        """Explain why an invite could not be redeemed"""
+        if not invite.is_active:
+            return HTTPException(status_code=400, detail="This invite is no longer active")
 
-        # Get container info
-        container = self.container_repo.get_by_id(invite.container_id)
+        if invite.expires_at and invite.expires_at <= datetime.utcnow():
+            return HTTPException(status_code=400, detail="This invite has expired")
 
-        return {
-            "message": "Successfully joined container",
-            "container": {
-                "container_id": container.container_id,
-                "name": container.name
-            },
-            "membership": {
-                "participant_id": membership.participant_id,
-                "role": membership.role,
-                "joined_at": membership.joined_at
-            }
-        }
+        # Still active and unexpired when loaded: the last use was just taken
+        return HTTPException(status_code=400, detail="This invite has reached its maximum usage limit")
 
     def deactivate_invite(self, invite_id: int, user_id: int) -> dict:
         """
@@ -173,11 +178,11 @@ class InviteService:
             raise HTTPException(status_code=404, detail="Invite not found")
 
         # Check if user is admin or creator
-        membership = self.membership_repo.get_user_membership(user_id, invite.container_id)
-        if not membership:
+        role = self.membership_repo.get_role(user_id, invite.container_id)
+        if not role:
             raise HTTPException(status_code=403, detail="You don't have access to this container")
 
-        if membership.role != "admin" and invite.created_by != user_id:
+        if role != "admin" and invite.created_by != user_id:
             raise HTTPException(status_code=403, detail="Only admins or invite creator can deactivate invites")
 
         # Deactivate
@@ -186,3 +191,21 @@ class InviteService:
             raise HTTPException(status_code=500, detail="Failed to deactivate invite")
 
         return {"message": "Invite deactivated successfully"}
+
+
+def sweep_expired_invites() -> int:
+    """Deactivate expired invites across all containers (runs on its own session)"""
+    with Session(engine) as session:
+        return InviteRepository(session).cleanup_expired()
+
+
+async def run_invite_sweeper(interval: int):
+    """Periodically sweep expired invites until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            deactivated = await anyio.to_thread.run_sync(sweep_expired_invites)
+            if deactivated:
+                print(f"🧹 Deactivated {deactivated} expired invites")
+        except Exception as e:
+            print(f"Warning: Invite sweep failed: {e}")
@@ -1,3 +1,4 @@
+import json
 from sqlmodel import Session
 from fastapi import HTTPException, status
 from typing import List
@@ -221,7 +222,7 @@ class MediaService:
         Delete media
 
         - Author or container admin can delete
-        - Also deletes file from storage
+        - Also deletes the file and its renditions from storage
         """
         media = self.media_repo.get_by_id(media_id)
         if not media:
@@ -248,8 +249,10 @@ class MediaService:
                 detail="Only the slip author or container admin can delete media"
             )
 
-        # Delete from storage
+        # Delete from storage, renditions included (also evicts their cached URLs)
         storage_service.delete_file(media.storage_url)
+        for rendition in json.loads(media.renditions or "[]"):
+            storage_service.delete_file(rendition["key"])
 
         # Delete from database
         success = self.media_repo.delete(media_id)
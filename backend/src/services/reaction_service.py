@@ -1,11 +1,13 @@
 from fastapi import HTTPException
-from typing import List
+from typing import List, Optional
 
 from ..repos.reaction_repo import ReactionRepository
 from ..repos.slip_repo import SlipRepository
 from ..repos.membership_repo import MembershipRepository
-from ..repos.user_repo import UserRepository
+from ..repos.user_repo import UserRepository, UserLoader
 from ..models.reaction import ReactionCreate, ReactionResponse, ReactionSummary, SlipReaction
+from ..models.slip import ReactionInfo
+from ..cores.pagination import decode_cursor
 
 
 class ReactionService:
@@ -22,10 +24,11 @@ class ReactionService:
         self.slip_repo = slip_repo
         self.membership_repo = membership_repo
         self.user_repo = user_repo
+        self.user_loader = UserLoader(user_repo)
 
     def _build_reaction_response(self, reaction: SlipReaction) -> ReactionResponse:
         """Build reaction response with user info"""
-        user = self.user_repo.get_by_id(reaction.user_id)
+        user = self.user_loader.get(reaction.user_id)
 
         return ReactionResponse(
             slip_reaction_id=reaction.slip_reaction_id,
@@ -44,8 +47,7 @@ class ReactionService:
             raise HTTPException(status_code=404, detail="Slip not found")
 
         # Check if user is member of the container
-        membership = self.membership_repo.get_user_membership(user_id, slip.container_id)
-        if not membership:
+        if not self.membership_repo.is_member(user_id, slip.container_id):
             raise HTTPException(status_code=403, detail="You don't have access to this slip")
 
         return slip
@@ -56,52 +58,57 @@ class ReactionService:
         If user already reacted with same type, remove it
         If user reacted with different type, update it
         If user hasn't reacted, add it
+
+        Returns the action taken, the replaced type and the slip's updated
+        reaction_count and per-type summary, read in the toggle's own
+        transaction
         """
         # Check access
         self._check_slip_access(reaction_data.slip_id, user_id)
 
-        # Check if user already reacted
-        existing_reaction = self.reaction_repo.get_user_reaction(reaction_data.slip_id, user_id)
-
-        if existing_reaction:
-            # Same type = remove (toggle off)
-            if existing_reaction.reaction_type == reaction_data.reaction_type:
-                self.reaction_repo.delete(existing_reaction.slip_reaction_id)
-                return {
-                    "message": "Reaction removed",
-                    "action": "removed"
-                }
-            # Different type = update
-            else:
-                updated_reaction = self.reaction_repo.update(
-                    existing_reaction.slip_reaction_id,
-                    reaction_data.reaction_type
-                )
-                return {
-                    "message": "Reaction updated",
-                    "action": "updated",
-                    "reaction": self._build_reaction_response(updated_reaction)
-                }
-        else:
-            # No reaction = add
-            new_reaction = self.reaction_repo.create(reaction_data, user_id)
-            return {
-                "message": "Reaction added",
-                "action": "added",
-                "reaction": self._build_reaction_response(new_reaction)
-            }
-
-    def get_slip_reactions(self, slip_id: int, user_id: int) -> List[ReactionResponse]:
+        # Toggle in place; a race with the user's other tap is retried in the repo
+        result = self.reaction_repo.toggle(
+            reaction_data.slip_id,
+            user_id,
+            reaction_data.reaction_type
+        )
+        if result is None:
+            raise HTTPException(status_code=409, detail="Reaction changed concurrently, please retry")
+
+        return {
+            "message": f"Reaction {result.action}",
+            "action": result.action,
+            "slip_id": reaction_data.slip_id,
+            "reaction_type": reaction_data.reaction_type,
+            "previous_reaction_type": result.previous_type,
+            "reaction_count": result.reaction_count,
+            "reaction_summary": [
+                ReactionInfo(reaction_type=reaction_type, count=count)
+                for reaction_type, count in result.reaction_summary.items()
+            ]
+        }
+
+    def get_slip_reactions(
+        self,
+        slip_id: int,
+        user_id: int,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> List[ReactionResponse]:
         """
         Get all reactions for a slip
         Only container members can view
+        Returns every reaction unless limit is given; pages by cursor
         """
         # Check access
         self._check_slip_access(slip_id, user_id)
 
         # Get reactions
-        reactions = self.reaction_repo.get_by_slip(slip_id)
+        after = decode_cursor(cursor) if cursor else None
+        reactions = self.reaction_repo.get_by_slip(slip_id, limit=limit, after=after)
 
+        # Resolve all users with one query
+        self.user_loader.prime(reaction.user_id for reaction in reactions)
         return [self._build_reaction_response(reaction) for reaction in reactions]
 
     def get_reaction_summary(self, slip_id: int, user_id: int) -> List[ReactionSummary]:
@@ -112,8 +119,9 @@ class ReactionService:
         # Check access
         self._check_slip_access(slip_id, user_id)
 
-        # Get all reactions
+        # Get all reactions and resolve their users with one query
         reactions = self.reaction_repo.get_by_slip(slip_id)
+        self.user_loader.prime(reaction.user_id for reaction in reactions)
 
         # Group by type
         summary_dict = {}
@@ -129,7 +137,7 @@ class ReactionService:
             summary_dict[reaction_type]["count"] += 1
 
             # Add user info
-            user = self.user_repo.get_by_id(reaction.user_id)
+            user = self.user_loader.get(reaction.user_id)
             if user:
                 summary_dict[reaction_type]["users"].append({
                     "user_id": user.user_id,
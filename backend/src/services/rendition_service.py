@@ -0,0 +1,177 @@
+"""
+Image rendition pipeline
+Resized WebP/JPEG copies of uploaded images, so feeds can serve a file that
+fits the client instead of the full-resolution original
+"""
+import io
+import json
+from sqlmodel import Session, select
+from typing import List, NamedTuple, Optional
+
+from ..models.media import Media, MediaType
+from ..repos.media_repo import MediaRepository
+from ..cores.config import settings
+from ..cores.database import engine
+from ..cores.storage import storage_service
+
+
+# Pillow save parameters and MIME type per rendition format
+RENDITION_FORMATS = {
+    "webp": {"pil_format": "WEBP", "content_type": "image/webp", "options": {"quality": 80, "method": 4}},
+    "jpeg": {"pil_format": "JPEG", "content_type": "image/jpeg", "options": {"quality": 82, "optimize": True, "progressive": True}},
+}
+
+
+class RenditionRequest(NamedTuple):
+    """What the client wants to display: target width in px and optional format"""
+    width: Optional[int] = None
+    format: Optional[str] = None
+
+
+def validate_rendition_settings():
+    """
+    Fail at startup on a MEDIA_RENDITION_FORMATS/WIDTHS entry the pipeline can't produce
+
+    Otherwise every upload would record no renditions, permanently.
+    """
+    unknown = [f for f in settings.MEDIA_RENDITION_FORMATS if f not in RENDITION_FORMATS]
+    if unknown:
+        raise ValueError(
+            f"MEDIA_RENDITION_FORMATS has unsupported formats {unknown}; "
+            f"choose from {sorted(RENDITION_FORMATS)}"
+        )
+    if not settings.MEDIA_RENDITION_FORMATS:
+        raise ValueError("MEDIA_RENDITION_FORMATS is empty")
+    invalid = [w for w in settings.MEDIA_RENDITION_WIDTHS if not isinstance(w, int) or w <= 0]
+    if invalid:
+        raise ValueError(f"MEDIA_RENDITION_WIDTHS must be positive integers, got {invalid}")
+
+
+def rendition_key(file_key: str, width: int, image_format: str) -> str:
+    """Derived storage key, e.g. image/<uuid>.jpg -> image/<uuid>_w480.webp"""
+    stem = file_key.rsplit(".", 1)[0] if "." in file_key.rsplit("/", 1)[-1] else file_key
+    return f"{stem}_w{width}.{image_format}"
+
+
+def render_image(data: bytes, file_key: str, widths: List[int], formats: List[str]) -> List[tuple]:
+    """
+    Resize an image to each width (never upscaling) in each format
+
+    Returns (rendition dict, encoded bytes) pairs, smallest width first.
+    """
+    # Imported here: only the background pipeline needs Pillow
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+    # Palette/greyscale/CMYK images are normalised so resizing can filter them
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    results = []
+    for width in sorted(set(widths)):
+        if width >= image.width:
+            break
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+        for image_format in formats:
+            spec = RENDITION_FORMATS[image_format]
+            # JPEG has no alpha; WebP keeps it
+            target = resized.convert("RGB") if image_format == "jpeg" else resized
+            buffer = io.BytesIO()
+            target.save(buffer, spec["pil_format"], **spec["options"])
+            results.append((
+                {
+                    "width": width,
+                    "height": height,
+                    "format": image_format,
+                    "key": rendition_key(file_key, width, image_format),
+                },
+                buffer.getvalue()
+            ))
+    return results
+
+
+def generate_renditions(media_id: int, store=storage_service, db_engine=engine) -> Optional[list]:
+    """
+    Build and store the renditions of one image, then record them on the media row
+
+    Runs in the background after create_media, on its own session. store
+    needs read_file/write_file (StorageService or a stand-in). Returns the
+    recorded renditions, or None when there was nothing to do.
+    """
+    with Session(db_engine) as session:
+        media_repo = MediaRepository(session)
+        media = media_repo.get_by_id(media_id)
+        if not media or media.media_type != MediaType.IMAGE or media.renditions is not None:
+            return None
+        file_key = media.storage_url
+
+        try:
+            data = store.read_file(file_key)
+        except Exception as e:
+            # Leave renditions NULL so backfill_renditions retries it
+            print(f"Warning: Could not read media {media_id} for renditions: {e}")
+            return None
+
+        try:
+            rendered = render_image(
+                data,
+                file_key,
+                settings.MEDIA_RENDITION_WIDTHS,
+                settings.MEDIA_RENDITION_FORMATS
+            )
+        except Exception as e:
+            # Not a decodable raster image (e.g. SVG): record none, serve the original
+            print(f"Warning: Media {media_id} can't be resized, serving original: {e}")
+            rendered = []
+
+        try:
+            for rendition, content in rendered:
+                store.write_file(rendition["key"], content, RENDITION_FORMATS[rendition["format"]]["content_type"])
+        except Exception as e:
+            print(f"Warning: Could not store renditions of media {media_id}: {e}")
+            return None
+
+        renditions = [rendition for rendition, _ in rendered]
+        media_repo.set_renditions(media_id, json.dumps(renditions))
+        return renditions
+
+
+def backfill_renditions(store=storage_service, db_engine=engine) -> int:
+    """Generate renditions for every image that has none yet; returns how many were processed"""
+    with Session(db_engine) as session:
+        media_ids = session.exec(
+            select(Media.media_id)
+            .where(Media.media_type == MediaType.IMAGE)
+            .where(Media.renditions == None)
+        ).all()
+
+    return sum(
+        1 for media_id in media_ids
+        if generate_renditions(media_id, store, db_engine) is not None
+    )
+
+
+def pick_rendition(media: Media, request: RenditionRequest) -> Optional[dict]:
+    """
+    Smallest rendition at least request.width wide, in the requested (or first configured) format
+
+    None means serve the original: no width asked, no renditions yet, or
+    the client wants more pixels than any rendition has.
+    """
+    if not request.width or not media.renditions:
+        return None
+
+    renditions = json.loads(media.renditions)
+    formats = [request.format] if request.format else settings.MEDIA_RENDITION_FORMATS
+    for image_format in formats:
+        candidates = [
+            rendition for rendition in renditions
+            if rendition["format"] == image_format and rendition["width"] >= request.width
+        ]
+        if candidates:
+            return min(candidates, key=lambda rendition: rendition["width"])
+    return None
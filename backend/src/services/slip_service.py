@@ -1,96 +1,136 @@
 from sqlmodel import Session
 from fastapi import HTTPException, status
-from typing import List
+from typing import List, Optional
 
 from ..models.slip import Slip, SlipCreate, SlipUpdate, SlipResponse, MediaInfo, EmotionInfo, CommentInfo, ReactionInfo
 from ..repos.slip_repo import SlipRepository
 from ..repos.membership_repo import MembershipRepository
-from ..repos.user_repo import UserRepository
+from ..repos.user_repo import UserRepository, UserLoader
 from ..repos.media_repo import MediaRepository
 from ..repos.comment_repo import CommentRepository
 from ..repos.reaction_repo import ReactionRepository
 from ..cores.storage import storage_service
+from ..cores.pagination import decode_cursor
+from .rendition_service import RenditionRequest, pick_rendition
 
 
 class SlipService:
     """Service for slip (journal entry) business logic"""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, rendition_request: RenditionRequest = RenditionRequest()):
         self.session = session
+        # Image size the client will display; picks the rendition behind download_url
+        self.rendition_request = rendition_request
         self.slip_repo = SlipRepository(session)
         self.membership_repo = MembershipRepository(session)
         self.user_repo = UserRepository(session)
+        self.user_loader = UserLoader(self.user_repo)
         self.media_repo = MediaRepository(session)
         self.comment_repo = CommentRepository(session)
         self.reaction_repo = ReactionRepository(session)
 
     def _build_slip_response(self, slip: Slip) -> SlipResponse:
         """Build enriched slip response with media and emotions"""
-        # Get author info
-        author = self.user_repo.get_by_id(slip.author_id)
+        return self._build_slip_responses([slip])[0]
+
+    def _build_slip_responses(self, slips: List[Slip]) -> List[SlipResponse]:
+        """
+        Build enriched slip responses for a whole page of slips
+
+        Uses a fixed number of set-based queries regardless of page size:
+        comments, comment authors + slip authors, media and reaction
+        summaries are each loaded with one IN (...) query. Comment and
+        reaction totals come from the slip's own counter columns.
+        """
+        if not slips:
+            return []
+
+        slip_ids = [slip.slip_id for slip in slips]
+
+        # Get comments (first 3 per slip)
+        comments_by_slip = {}
+        for comment in self.comment_repo.get_first_by_slips(slip_ids, per_slip=3):
+            comments_by_slip.setdefault(comment.slip_id, []).append(comment)
+
+        # Resolve slip authors and comment authors together
+        self.user_loader.prime(slip.author_id for slip in slips)
+        for comments in comments_by_slip.values():
+            self.user_loader.prime(comment.author_id for comment in comments)
 
         # Get media
-        media_list = self.media_repo.get_by_slip(slip.slip_id)
-        media_info = []
-        for media in media_list:
-            download_url = storage_service.generate_download_url(media.storage_url)
-            media_info.append(
-                MediaInfo(
-                    media_id=media.media_id,
-                    media_type=media.media_type,
-                    storage_url=media.storage_url,
-                    caption=media.caption,
-                    download_url=download_url
+        media_by_slip = {}
+        for media in self.media_repo.get_by_slips(slip_ids):
+            media_by_slip.setdefault(media.slip_id, []).append(media)
+
+        # Get reactions summary
+        reaction_summaries = self.reaction_repo.get_reaction_summaries(slip_ids)
+
+        responses = []
+        for slip in slips:
+            author = self.user_loader.get(slip.author_id)
+
+            media_info = []
+            for media in media_by_slip.get(slip.slip_id, []):
+                rendition = pick_rendition(media, self.rendition_request)
+                download_url = storage_service.generate_download_url(
+                    rendition["key"] if rendition else media.storage_url
                 )
-            )
+                media_info.append(
+                    MediaInfo(
+                        media_id=media.media_id,
+                        media_type=media.media_type,
+                        storage_url=media.storage_url,
+                        caption=media.caption,
+                        download_url=download_url
+                    )
+                )
+
+            # TODO: Get emotion log when EmotionLog is implemented
+            # For now, set to None
+            emotion = None
+
+            comments_info = []
+            for comment in comments_by_slip.get(slip.slip_id, []):
+                comment_author = self.user_loader.get(comment.author_id)
+                comments_info.append(
+                    CommentInfo(
+                        comment_id=comment.comment_id,
+                        author_id=comment.author_id,
+                        author_username=comment_author.username if comment_author else None,
+                        author_profile_picture=comment_author.profile_picture_url if comment_author else None,
+                        text_content=comment.text_content,
+                        created_at=comment.created_at
+                    )
+                )
+
+            reactions_summary = reaction_summaries.get(slip.slip_id, {})
+            reactions_info = [
+                ReactionInfo(reaction_type=reaction_type, count=count)
+                for reaction_type, count in reactions_summary.items()
+            ]
 
-        # TODO: Get emotion log when EmotionLog is implemented
-        # For now, set to None
-        emotion = None
-
-        # Get comments (recent 3 only)
-        comments_list = self.comment_repo.get_by_slip(slip.slip_id, skip=0, limit=3)
-        comments_info = []
-        for comment in comments_list:
-            comment_author = self.user_repo.get_by_id(comment.author_id)
-            comments_info.append(
-                CommentInfo(
-                    comment_id=comment.comment_id,
-                    author_id=comment.author_id,
-                    author_username=comment_author.username if comment_author else None,
-                    author_profile_picture=comment_author.profile_picture_url if comment_author else None,
-                    text_content=comment.text_content,
-                    created_at=comment.created_at
+            responses.append(
+                SlipResponse(
+                    slip_id=slip.slip_id,
+                    container_id=slip.container_id,
+                    author_id=slip.author_id,
+                    title=slip.title,
+                    text_content=slip.text_content,
+                    created_at=slip.created_at,
+                    location_data=slip.location_data,
+                    author_username=author.username if author else None,
+                    author_email=author.email if author else None,
+                    author_profile_picture=author.profile_picture_url if author else None,
+                    media=media_info,
+                    emotion=emotion,
+                    comments=comments_info,
+                    comment_count=slip.comment_count,
+                    reactions=reactions_info,
+                    reaction_count=slip.reaction_count
                 )
             )
-        comment_count = self.comment_repo.count_by_slip(slip.slip_id)
 
-        # Get reactions summary
-        reactions_summary = self.reaction_repo.get_reaction_summary(slip.slip_id)
-        reactions_info = [
-            ReactionInfo(reaction_type=reaction_type, count=count)
-            for reaction_type, count in reactions_summary.items()
-        ]
-        reaction_count = self.reaction_repo.count_by_slip(slip.slip_id)
-
-        return SlipResponse(
-            slip_id=slip.slip_id,
-            container_id=slip.container_id,
-            author_id=slip.author_id,
-            title=slip.title,
-            text_content=slip.text_content,
-            created_at=slip.created_at,
-            location_data=slip.location_data,
-            author_username=author.username if author else None,
-            author_email=author.email if author else None,
-            author_profile_picture=author.profile_picture_url if author else None,
-            media=media_info,
-            emotion=emotion,
-            comments=comments_info,
-            comment_count=comment_count,
-            reactions=reactions_info,
-            reaction_count=reaction_count
-        )
+        return responses
 
     def create_slip(self, slip_data: SlipCreate, author_id: int) -> SlipResponse:
         """
@@ -135,11 +175,13 @@ class SlipService:
         container_id: int,
         user_id: int,
         skip: int = 0,
-        limit: int = 50
+        limit: int = 50,
+        cursor: Optional[str] = None
     ) -> List[SlipResponse]:
         """
         Get all slips in a container
         - User must be member of the container
+        - Pages by cursor when given, otherwise by skip/limit
         """
         # Check access
         if not self.membership_repo.is_member(user_id, container_id):
@@ -149,33 +191,30 @@ class SlipService:
             )
 
         # Get slips
-        slips = self.slip_repo.get_by_container(container_id, skip, limit)
+        after = decode_cursor(cursor) if cursor else None
+        slips = self.slip_repo.get_by_container(container_id, skip, limit, after=after)
 
         # Build enriched responses
-        return [self._build_slip_response(slip) for slip in slips]
+        return self._build_slip_responses(slips)
 
     def get_user_slips(
         self,
         author_id: int,
         current_user_id: int,
         skip: int = 0,
-        limit: int = 50
+        limit: int = 50,
+        cursor: Optional[str] = None
     ) -> List[SlipResponse]:
         """
         Get all slips by a user
         - Returns only slips in containers current_user has access to
+        - Pages by cursor when given, otherwise by skip/limit
         """
-        # Get all slips by author
-        slips = self.slip_repo.get_by_author(author_id, skip, limit)
-
-        # Filter by access and build enriched responses
-        responses = []
-        for slip in slips:
-            # Check if current user has access to this slip's container
-            if self.membership_repo.is_member(current_user_id, slip.container_id):
-                responses.append(self._build_slip_response(slip))
+        # Get slips by author that current user can see (filtered in SQL)
+        after = decode_cursor(cursor) if cursor else None
+        slips = self.slip_repo.get_visible_by_author(author_id, current_user_id, skip, limit, after=after)
 
-        return responses
+        return self._build_slip_responses(slips)
 
     def update_slip(
         self,
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Test Firebase ID token verification against a local stand-in key server
+
+Serves a self-signed certificate the way Google does (kid -> PEM map with a
+Cache-Control max-age), signs ID tokens with its key and checks that
+FirebaseTokenVerifier accepts, rejects and caches as expected.
+
+    python test_firebase_verifier.py
+"""
+import sys
+sys.path.insert(0, '.')
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from jose import jwt
+
+from src.cores.firebase_config import FirebaseTokenVerifier
+
+
+PROJECT_ID = "jar-talk-test"
+KID = "test-key-1"
+MAX_AGE = 3600
+
+
+def make_key_pair():
+    """RSA private key (PEM) and matching self-signed certificate (PEM)"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken.local")])
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(datetime.utcnow() - timedelta(days=1))
+        .not_valid_after(datetime.utcnow() + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+def start_key_server(certs: dict, state: dict) -> ThreadingHTTPServer:
+    """
+    Serve `certs` on a free localhost port with a Cache-Control max-age
+
+    state["status"] != 200 makes the server fail; state["delay"] slows it down.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(state.get("delay", 0))
+            if state.get("status", 200) != 200:
+                self.send_error(state["status"])
+                return
+            body = json.dumps(certs).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Cache-Control", f"public, max-age={MAX_AGE}, must-revalidate")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_id_token(private_pem: str, kid: str = KID, **overrides) -> str:
+    """Sign an ID token shaped like Firebase's"""
+    now = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "auth_time": now - 10,
+        "iat": now - 10,
+        "exp": now + 3600,
+        "sub": "firebase-uid-123",
+        "email": "test@example.com",
+        "name": "Test User",
+        "picture": "https://example.com/photo.png",
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": kid})
+
+
+def expect_rejected(verifier: FirebaseTokenVerifier, token: str, label: str) -> bool:
+    try:
+        verifier.verify(token)
+        print(f"   ❌ {label}: should have failed!")
+        return False
+    except ValueError as e:
+        print(f"   ✅ {label}: {e}")
+        return True
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Firebase ID Token Verifier Test")
+    print("="*60)
+
+    private_pem, cert_pem = make_key_pair()
+    other_pem, _ = make_key_pair()
+    server_state = {}
+    server = start_key_server({KID: cert_pem}, server_state)
+    verifier = FirebaseTokenVerifier(
+        certs_url=f"http://127.0.0.1:{server.server_port}/certs",
+        project_id=PROJECT_ID
+    )
+    ok = True
+
+    # Test 1: Valid token
+    print("\n1. Verifying a valid token...")
+    claims = verifier.verify(make_id_token(private_pem))
+    print(f"   ✅ uid={claims['uid']} name={claims['name']}")
+    ok &= claims["uid"] == "firebase-uid-123"
+
+    # Test 2: Keys are cached for max-age
+    print("\n2. Verifying 1000 more times...")
+    token = make_id_token(private_pem)
+    start = time.perf_counter()
+    for _ in range(1000):
+        verifier.verify(token)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"   Key fetches: {verifier.fetches} ({elapsed / 1000:.3f} ms per verify)")
+    ok &= verifier.fetches == 1
+
+    # Test 3: Invalid tokens
+    print("\n3. Rejecting invalid tokens...")
+    ok &= expect_rejected(verifier, make_id_token(other_pem), "wrong signature")
+    ok &= expect_rejected(verifier, make_id_token(private_pem, aud="other-project"), "wrong audience")
+    ok &= expect_rejected(verifier, make_id_token(private_pem, iss="https://evil.example.com"), "wrong issuer")
+    ok &= expect_rejected(verifier, make_id_token(private_pem, exp=int(time.time()) - 60), "expired")
+    ok &= expect_rejected(verifier, make_id_token(private_pem, sub=""), "empty subject")
+    ok &= expect_rejected(verifier, make_id_token(private_pem, kid="unknown"), "unknown key ID")
+
+    # Test 4: Unknown key IDs don't refetch within refetch_interval
+    print("\n4. Checking refetch throttling...")
+    for _ in range(10):
+        try:
+            verifier.verify(make_id_token(private_pem, kid="unknown"))
+        except ValueError:
+            pass
+    print(f"   Key fetches: {verifier.fetches}")
+    ok &= verifier.fetches == 1
+
+    # Test 5: A failed refresh keeps serving the cached keys
+    print("\n5. Refreshing while the key server is down...")
+    server_state["status"] = 503
+    verifier._expires_at = 0.0
+    results = [verifier.verify(token)["uid"] for _ in range(100)]
+    print(f"   Verified {len(results)} logins, fetch failures: {verifier.fetch_failures}")
+    ok &= len(results) == 100 and verifier.fetch_failures == 1
+
+    # Test 6: A slow refresh doesn't block logins the cache can serve
+    print("\n6. Refreshing while the key server is slow...")
+    server_state.update(status=200, delay=1.0)
+    verifier._expires_at = 0.0
+    fetches_before = verifier.fetches
+    latencies = []
+
+    def login():
+        start = time.perf_counter()
+        verifier.verify(token)
+        latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=login) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    print(f"   20 logins: fastest 19 within {latencies[-2] * 1000:.1f} ms, "
+          f"the refreshing one {latencies[-1] * 1000:.0f} ms, fetches: {verifier.fetches - fetches_before}")
+    ok &= latencies[-2] < 0.5 and verifier.fetches - fetches_before == 1
+
+    # Test 7: With nothing cached, a failing key server rejects the login
+    print("\n7. First fetch fails...")
+    server_state.update(status=503, delay=0)
+    cold = FirebaseTokenVerifier(certs_url=verifier.certs_url, project_id=PROJECT_ID)
+    ok &= expect_rejected(cold, token, "no cached keys")
+
+    server.shutdown()
+    print("\n" + "="*60)
+    if ok:
+        print("✅ All checks passed")
+    else:
+        print("❌ Some checks failed")
+        sys.exit(1)
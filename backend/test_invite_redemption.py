@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Stress test invite redemption against the configured database
+
+Many users join the same limited invite at once; exactly max_uses of them
+must get in, and the invite must end up with current_uses == max_uses.
+
+    python test_invite_redemption.py                # 50 joiners, max_uses=10
+    python test_invite_redemption.py 200 25         # 200 joiners, max_uses=25
+"""
+import sys
+sys.path.insert(0, '.')
+
+import secrets
+import threading
+from fastapi import HTTPException
+from sqlmodel import Session, select, delete, func
+
+from src.cores.database import engine
+from src.models.user import User
+from src.models.container import Container
+from src.models.membership import Membership
+from src.models.invite import Invite
+from src.repos.invite_repo import InviteRepository
+from src.repos.membership_repo import MembershipRepository
+from src.repos.container_repo import ContainerRepository
+from src.services.invite_service import InviteService
+
+
+def run_stress_test(engine, joiners: int = 50, max_uses: int = 10) -> bool:
+    """Race `joiners` users on one invite limited to `max_uses`; True if the count is exact"""
+    tag = secrets.token_hex(4)
+
+    # Setup: owner, joiners, container and a limited invite
+    with Session(engine) as session:
+        users = [
+            User(username=f"stress_{tag}_{i}", email=f"stress_{tag}_{i}@example.com", firebase_uid=f"stress_{tag}_{i}")
+            for i in range(joiners + 1)
+        ]
+        session.add_all(users)
+        session.flush()
+        owner, joiner_ids = users[0], [user.user_id for user in users[1:]]
+
+        container = Container(name=f"stress_{tag}", owner_id=owner.user_id, member_count=1)
+        session.add(container)
+        session.flush()
+        session.add(Membership(user_id=owner.user_id, container_id=container.container_id, role="admin"))
+
+        invite = Invite(
+            container_id=container.container_id,
+            invite_code=f"stress{tag}",
+            created_by=owner.user_id,
+            max_uses=max_uses
+        )
+        session.add(invite)
+        session.commit()
+        user_ids = [owner.user_id] + joiner_ids
+        container_id, invite_id, invite_code = container.container_id, invite.invite_id, invite.invite_code
+
+    # Race: every joiner redeems the code at the same moment
+    barrier = threading.Barrier(joiners)
+    results = []
+    lock = threading.Lock()
+
+    def join(user_id: int):
+        with Session(engine) as session:
+            service = InviteService(
+                InviteRepository(session),
+                MembershipRepository(session),
+                ContainerRepository(session)
+            )
+            barrier.wait()
+            try:
+                service.join_by_code(invite_code, user_id)
+                outcome = "joined"
+            except HTTPException as e:
+                outcome = e.detail
+        with lock:
+            results.append(outcome)
+
+    threads = [threading.Thread(target=join, args=(user_id,)) for user_id in joiner_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Verify
+    with Session(engine) as session:
+        invite = session.get(Invite, invite_id)
+        members = session.exec(
+            select(func.count()).select_from(Membership).where(Membership.container_id == container_id)
+        ).one()
+        member_count = session.get(Container, container_id).member_count
+        joined = results.count("joined")
+
+        print(f"   Joined: {joined}, refused: {len(results) - joined}")
+        print(f"   invite.current_uses={invite.current_uses} is_active={invite.is_active}")
+        print(f"   memberships={members} container.member_count={member_count}")
+
+        expected = min(joiners, max_uses)
+        exact = (
+            joined == expected
+            and invite.current_uses == expected
+            and members == expected + 1
+            and member_count == expected + 1
+            and invite.is_active == (expected < max_uses)
+        )
+
+        # Cleanup
+        session.exec(delete(Invite).where(Invite.invite_id == invite_id))
+        session.exec(delete(Membership).where(Membership.container_id == container_id))
+        session.exec(delete(Container).where(Container.container_id == container_id))
+        session.exec(delete(User).where(User.user_id.in_(user_ids)))
+        session.commit()
+
+    return exact
+
+
+if __name__ == "__main__":
+    joiners = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    max_uses = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print("="*60)
+    print(f"Invite Redemption Stress Test ({joiners} joiners, max_uses={max_uses})")
+    print("="*60)
+
+    if run_stress_test(engine, joiners, max_uses):
+        print("\n✅ Redemption count is exact")
+    else:
+        print("\n❌ Invite over- or under-admitted")
+        sys.exit(1)
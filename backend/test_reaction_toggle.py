@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Stress test reaction toggles against the configured database
+
+One user first toggles add -> switch -> remove, and every returned
+reaction_count/reaction_summary must match the rows. Then many threads
+hammer one slip:
+  1. every user double-taps the same type at once: the taps must cancel out
+  2. every user toggles random types from several threads at once
+
+Afterwards slip.reaction_count and the slipreactioncount rows must match
+COUNT(*) over slipreaction, with one row per (slip, user) at most. A toggle
+that loses every retry to the same user's other threads is reported, not
+failed: the API answers it with 409 and nothing was written.
+
+    python test_reaction_toggle.py                  # 50 users, 4 threads x 10 toggles each
+    python test_reaction_toggle.py 200 8 20         # 200 users, 8 threads x 20 toggles each
+"""
+import sys
+sys.path.insert(0, '.')
+
+import random
+import secrets
+import threading
+from sqlmodel import Session, select, delete, func
+
+from src.cores.database import engine
+from src.models.user import User
+from src.models.container import Container
+from src.models.membership import Membership
+from src.models.slip import Slip
+from src.models.reaction import SlipReaction, SlipReactionCount
+from src.repos.reaction_repo import ReactionRepository
+
+
+REACTION_TYPES = ["Heart", "Fire", "Resonate"]
+
+
+def race(engine, slip_id: int, taps: list) -> tuple:
+    """
+    Run each (user_id, [reaction_type, ...]) on its own thread, released together
+
+    Returns (errors, gave_up): exceptions raised, and toggles that lost every
+    retry (the API answers those with 409).
+    """
+    barrier = threading.Barrier(len(taps))
+    errors, gave_up = [], []
+    lock = threading.Lock()
+
+    def tap(user_id: int, reaction_types: list):
+        with Session(engine) as session:
+            repo = ReactionRepository(session)
+            barrier.wait()
+            for reaction_type in reaction_types:
+                try:
+                    if repo.toggle(slip_id, user_id, reaction_type) is None:
+                        with lock:
+                            gave_up.append(user_id)
+                except Exception as e:
+                    session.rollback()
+                    with lock:
+                        errors.append(repr(e))
+
+    threads = [threading.Thread(target=tap, args=args) for args in taps]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors, gave_up
+
+
+def check_counters(engine, slip_id: int) -> bool:
+    """Denormalised counters match the reaction rows; prints both"""
+    with Session(engine) as session:
+        rows = session.exec(
+            select(func.count()).select_from(SlipReaction).where(SlipReaction.slip_id == slip_id)
+        ).one()
+        users = session.exec(
+            select(func.count(func.distinct(SlipReaction.user_id))).where(SlipReaction.slip_id == slip_id)
+        ).one()
+        by_type = dict(session.exec(
+            select(SlipReaction.reaction_type, func.count())
+            .where(SlipReaction.slip_id == slip_id)
+            .group_by(SlipReaction.reaction_type)
+        ).all())
+        counters = {
+            row.reaction_type: row.count
+            for row in session.exec(select(SlipReactionCount).where(SlipReactionCount.slip_id == slip_id)).all()
+            if row.count
+        }
+        total = session.get(Slip, slip_id).reaction_count
+
+    print(f"   COUNT(*)={rows} users={users} slip.reaction_count={total}")
+    print(f"   by type {by_type} slipreactioncount {counters}")
+    return rows == users == total and by_type == counters
+
+
+def run_stress_test(engine, users: int = 50, threads_per_user: int = 4, toggles: int = 10) -> bool:
+    """Race toggles on one slip; True if no toggle failed and every counter is exact"""
+    tag = secrets.token_hex(4)
+
+    # Setup: users, container and one slip
+    with Session(engine) as session:
+        members = [
+            User(username=f"toggle_{tag}_{i}", email=f"toggle_{tag}_{i}@example.com", firebase_uid=f"toggle_{tag}_{i}")
+            for i in range(users)
+        ]
+        session.add_all(members)
+        session.flush()
+        user_ids = [user.user_id for user in members]
+
+        container = Container(name=f"toggle_{tag}", owner_id=user_ids[0], member_count=users)
+        session.add(container)
+        session.flush()
+        session.add_all([
+            Membership(user_id=user_id, container_id=container.container_id, role="member")
+            for user_id in user_ids
+        ])
+        slip = Slip(container_id=container.container_id, author_id=user_ids[0], text_content="toggle")
+        session.add(slip)
+        session.commit()
+        container_id, slip_id = container.container_id, slip.slip_id
+
+    ok = True
+
+    print("\n0. Returned counts...")
+    steps = [("Heart", "added", None), ("Fire", "updated", "Heart"), ("Fire", "removed", "Fire")]
+    with Session(engine) as session:
+        repo = ReactionRepository(session)
+        for reaction_type, action, previous_type in steps:
+            result = repo.toggle(slip_id, user_ids[0], reaction_type)
+            rows = dict(session.exec(
+                select(SlipReaction.reaction_type, func.count())
+                .where(SlipReaction.slip_id == slip_id)
+                .group_by(SlipReaction.reaction_type)
+            ).all())
+            matches = (
+                result is not None
+                and (result.action, result.previous_type) == (action, previous_type)
+                and result.reaction_count == sum(rows.values())
+                and result.reaction_summary == rows
+            )
+            ok &= matches
+            print(f"   {'✅' if matches else '❌'} {reaction_type}: {result}")
+
+    print("\n1. Double taps (2 concurrent first taps per user)...")
+    errors, gave_up = race(engine, slip_id, [(user_id, ["Heart"]) for user_id in user_ids for _ in range(2)])
+    ok &= not errors and not gave_up
+    print(f"   errors: {len(errors)} {errors[:3]}, gave up: {len(gave_up)}")
+    ok &= check_counters(engine, slip_id)
+    with Session(engine) as session:
+        left = session.exec(
+            select(func.count()).select_from(SlipReaction).where(SlipReaction.slip_id == slip_id)
+        ).one()
+    print(f"   {'✅' if left == 0 else '❌'} every double tap cancelled out ({left} left)")
+    ok &= left == 0
+
+    print(f"\n2. Random toggles ({users} users x {threads_per_user} threads x {toggles})...")
+    rng = random.Random(tag)
+    taps = [
+        (user_id, [rng.choice(REACTION_TYPES) for _ in range(toggles)])
+        for user_id in user_ids
+        for _ in range(threads_per_user)
+    ]
+    errors, gave_up = race(engine, slip_id, taps)
+    ok &= not errors
+    print(f"   errors: {len(errors)} {errors[:3]}, gave up (409): {len(gave_up)}")
+    ok &= check_counters(engine, slip_id)
+
+    # Cleanup
+    with Session(engine) as session:
+        session.exec(delete(SlipReactionCount).where(SlipReactionCount.slip_id == slip_id))
+        session.exec(delete(SlipReaction).where(SlipReaction.slip_id == slip_id))
+        session.exec(delete(Slip).where(Slip.slip_id == slip_id))
+        session.exec(delete(Membership).where(Membership.container_id == container_id))
+        session.exec(delete(Container).where(Container.container_id == container_id))
+        session.exec(delete(User).where(User.user_id.in_(user_ids)))
+        session.commit()
+
+    return ok
+
+
+if __name__ == "__main__":
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    threads_per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    toggles = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    print("="*60)
+    print(f"Reaction Toggle Stress Test ({users} users, {threads_per_user} threads each)")
+    print("="*60)
+
+    if run_stress_test(engine, users, threads_per_user, toggles):
+        print("\n✅ Counters match the reaction rows")
+    else:
+        print("\n❌ Toggle failed or counters drifted")
+        sys.exit(1)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test read-replica routing with two SQLite databases standing in for MySQL
+
+The "primary" and "replica" files hold different data, so each response
+shows which database served it. Checks that GETs read from the replica,
+writes (including raw text() SQL) go to the primary, a writer's reads stick
+to the primary for the read-your-writes window, and get_primary_session
+reads the primary.
+
+    python test_read_replica.py
+"""
+import sys
+sys.path.insert(0, '.')
+
+import os
+import tempfile
+import time
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, Session, create_engine, select, text
+
+from src.cores.database import SessionRouter, get_session, get_primary_session
+from src.cores.security import create_access_token
+from src.models.user import User
+
+
+STICKY_SECONDS = 1
+
+
+def make_engine(path: str, username: str):
+    """SQLite database with the schema and one marker user"""
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(username=username, email=f"{username}@example.com", firebase_uid=username))
+        session.commit()
+    return engine
+
+
+def make_app() -> FastAPI:
+    """Endpoints using the real get_session and get_primary_session dependencies"""
+    app = FastAPI()
+
+    @app.get("/source")
+    def source(session: Session = Depends(get_session)):
+        return {"usernames": sorted(session.exec(select(User.username)).all())}
+
+    @app.post("/users/{username}")
+    def create_user(username: str, session: Session = Depends(get_session)):
+        session.add(User(username=username, email=f"{username}@example.com", firebase_uid=username))
+        session.commit()
+        return {"created": username}
+
+    @app.get("/write-on-get/{username}")
+    def write_on_get(username: str, session: Session = Depends(get_session)):
+        # A GET that writes must still land on the primary
+        session.exec(select(User)).all()
+        session.add(User(username=username, email=f"{username}@example.com", firebase_uid=username))
+        session.commit()
+        return {"usernames": sorted(session.exec(select(User.username)).all())}
+
+    @app.get("/raw-write/{username}")
+    def raw_write(username: str, session: Session = Depends(get_session)):
+        # A raw text() write must land on the primary too
+        session.exec(text(
+            "INSERT INTO user (username, email, firebase_uid, created_at) "
+            "VALUES (:name, :name || '@example.com', :name, CURRENT_TIMESTAMP)"
+        ).bindparams(name=username))
+        session.commit()
+        return {"usernames": sorted(session.exec(select(User.username)).all())}
+
+    @app.get("/primary-source")
+    def primary_source(session: Session = Depends(get_primary_session)):
+        return {"usernames": sorted(session.exec(select(User.username)).all())}
+
+    return app
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Read Replica Routing Test")
+    print("="*60)
+
+    tmp = tempfile.mkdtemp()
+    primary = make_engine(os.path.join(tmp, "primary.db"), "on_primary")
+    replica = make_engine(os.path.join(tmp, "replica.db"), "on_replica")
+    router = SessionRouter(primary, [replica], sticky_seconds=STICKY_SECONDS)
+
+    app = make_app()
+    app.dependency_overrides[get_session] = router.for_request
+
+    def primary_session(request: Request):
+        yield from router.for_request(request, primary=True)
+
+    app.dependency_overrides[get_primary_session] = primary_session
+    client = TestClient(app)
+    auth = {"Authorization": f"Bearer {create_access_token({'sub': '42'})}"}
+    other = {"Authorization": f"Bearer {create_access_token({'sub': '43'})}"}
+    ok = True
+
+    print("\n1. Reads...")
+    ok &= check("anonymous GET reads the replica", "on_replica" in client.get("/source").json()["usernames"])
+    ok &= check("authenticated GET reads the replica", "on_replica" in client.get("/source", headers=auth).json()["usernames"])
+
+    print("\n2. Writes...")
+    client.post("/users/alice", headers=auth)
+    with Session(primary) as session:
+        ok &= check("POST wrote to the primary", session.exec(select(User).where(User.username == "alice")).first() is not None)
+    with Session(replica) as session:
+        ok &= check("replica untouched", session.exec(select(User).where(User.username == "alice")).first() is None)
+
+    print("\n3. Read-your-writes...")
+    ok &= check("writer's GET sticks to the primary", "alice" in client.get("/source", headers=auth).json()["usernames"])
+    ok &= check("other users still read the replica", "on_replica" in client.get("/source", headers=other).json()["usernames"])
+    time.sleep(STICKY_SECONDS + 0.1)
+    ok &= check("writer back on the replica after the window", "on_replica" in client.get("/source", headers=auth).json()["usernames"])
+
+    print("\n4. Writes inside a GET...")
+    usernames = client.get("/write-on-get/bob", headers=other).json()["usernames"]
+    ok &= check("write and read-back went to the primary", "bob" in usernames and "on_primary" in usernames)
+
+    print("\n5. Raw SQL and the primary override...")
+    time.sleep(STICKY_SECONDS + 0.1)
+    third = {"Authorization": f"Bearer {create_access_token({'sub': '44'})}"}
+    usernames = client.get("/raw-write/carol", headers=third).json()["usernames"]
+    ok &= check("text() write and read-back went to the primary", "carol" in usernames and "on_primary" in usernames)
+    ok &= check("a GET that wrote pins its user", "carol" in client.get("/source", headers=third).json()["usernames"])
+    ok &= check("get_primary_session reads the primary", "on_primary" in client.get("/primary-source").json()["usernames"])
+
+    print("\n6. No replicas configured...")
+    app.dependency_overrides[get_session] = SessionRouter(primary).for_request
+    ok &= check("GET reads the primary", "on_primary" in client.get("/source").json()["usernames"])
+
+    print("\n" + "="*60)
+    if ok:
+        print("✅ All checks passed")
+    else:
+        print("❌ Some checks failed")
+        sys.exit(1)
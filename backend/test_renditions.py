@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Test the image rendition pipeline with a filesystem stand-in for MinIO
+
+Uploads a generated photo to a temporary directory, runs the pipeline
+against a SQLite database and checks the stored renditions, the media row
+and which URL the slip feed serves for different client widths.
+
+    python test_renditions.py
+"""
+import sys
+sys.path.insert(0, '.')
+
+import io
+import json
+import os
+import tempfile
+from PIL import Image
+from sqlmodel import SQLModel, Session, create_engine
+
+from src.cores.config import settings
+from src.models.user import User
+from src.models.container import Container
+from src.models.membership import Membership
+from src.models.slip import Slip
+from src.models.media import Media
+from src.services import media_service
+from src.services.rendition_service import (
+    RenditionRequest, generate_renditions, pick_rendition, validate_rendition_settings
+)
+from src.services.slip_service import SlipService
+
+
+class FileStore:
+    """Filesystem stand-in for StorageService's read_file/write_file/delete_file"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.content_types = {}
+
+    def _path(self, file_key: str) -> str:
+        return os.path.join(self.root, *file_key.split("/"))
+
+    def read_file(self, file_key: str) -> bytes:
+        with open(self._path(file_key), "rb") as f:
+            return f.read()
+
+    def write_file(self, file_key: str, data: bytes, content_type: str):
+        path = self._path(file_key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        self.content_types[file_key] = content_type
+
+    def delete_file(self, file_key: str) -> bool:
+        os.remove(self._path(file_key))
+        return True
+
+    def exists(self, file_key: str) -> bool:
+        return os.path.exists(self._path(file_key))
+
+
+def make_photo(width: int, height: int) -> bytes:
+    """A noisy gradient JPEG, so sizes resemble a real photo"""
+    image = Image.effect_noise((width, height), 64).convert("RGB")
+    image = Image.blend(image, Image.linear_gradient("L").resize((width, height)).convert("RGB"), 0.5)
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def check(label: str, ok: bool) -> bool:
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+if __name__ == "__main__":
+    print("="*60)
+    print("Image Rendition Pipeline Test")
+    print("="*60)
+
+    tmp = tempfile.mkdtemp()
+    store = FileStore(os.path.join(tmp, "bucket"))
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, 'test.db')}")
+    SQLModel.metadata.create_all(engine)
+
+    # Setup: user, container, slip, an uploaded 3000x2000 photo and an audio clip
+    original_key = "image/3f2b9c1e-photo.jpg"
+    store.write_file(original_key, make_photo(3000, 2000), "image/jpeg")
+    with Session(engine) as session:
+        user = User(username="renditions", email="renditions@example.com", firebase_uid="renditions")
+        session.add(user)
+        session.flush()
+        container = Container(name="renditions", owner_id=user.user_id, member_count=1)
+        session.add(container)
+        session.flush()
+        session.add(Membership(user_id=user.user_id, container_id=container.container_id, role="admin"))
+        slip = Slip(container_id=container.container_id, author_id=user.user_id, text_content="photo")
+        session.add(slip)
+        session.flush()
+        photo = Media(slip_id=slip.slip_id, media_type="image", storage_url=original_key)
+        audio = Media(slip_id=slip.slip_id, media_type="audio", storage_url="audio/clip.m4a")
+        session.add_all([photo, audio])
+        session.commit()
+        slip_id, user_id, photo_id, audio_id = slip.slip_id, user.user_id, photo.media_id, audio.media_id
+
+    ok = True
+
+    print("\n1. Generating renditions...")
+    renditions = generate_renditions(photo_id, store=store, db_engine=engine)
+    expected = len(settings.MEDIA_RENDITION_WIDTHS) * len(settings.MEDIA_RENDITION_FORMATS)
+    ok &= check(f"{expected} renditions generated", renditions is not None and len(renditions) == expected)
+    original_size = len(store.read_file(original_key))
+    for rendition in renditions or []:
+        data = store.read_file(rendition["key"])
+        with Image.open(io.BytesIO(data)) as image:
+            fits = image.size == (rendition["width"], rendition["height"]) and image.format.lower() == rendition["format"]
+        ok &= check(
+            f"{rendition['key']}: {rendition['width']}x{rendition['height']} {rendition['format']}, "
+            f"{len(data) / 1024:.0f} KB (original {original_size / 1024:.0f} KB)",
+            fits and store.content_types[rendition["key"]] == f"image/{rendition['format']}"
+        )
+
+    print("\n2. Recorded on the media row...")
+    with Session(engine) as session:
+        photo = session.get(Media, photo_id)
+        ok &= check("media.renditions matches", json.loads(photo.renditions) == renditions)
+        ok &= check("audio is skipped", generate_renditions(audio_id, store=store, db_engine=engine) is None)
+        ok &= check("already processed image is skipped", generate_renditions(photo_id, store=store, db_engine=engine) is None)
+
+        print("\n3. Picking a rendition...")
+        pick = lambda width, image_format=None: pick_rendition(photo, RenditionRequest(width, image_format))
+        ok &= check("no width -> original", pick(None) is None)
+        ok &= check("150px -> 200w webp", pick(150)["key"].endswith("_w200.webp"))
+        ok &= check("200px -> 200w webp", pick(200)["key"].endswith("_w200.webp"))
+        ok &= check("600px -> 1080w webp", pick(600)["key"].endswith("_w1080.webp"))
+        ok &= check("600px jpeg -> 1080w jpeg", pick(600, "jpeg")["key"].endswith("_w1080.jpeg"))
+        ok &= check("2000px -> original", pick(2000) is None)
+
+    print("\n4. Slip feed URLs...")
+    with Session(engine) as session:
+        slip = session.get(Slip, slip_id)
+        default = SlipService(session)._build_slip_response(slip)
+        tiles = SlipService(session, RenditionRequest(width=200))._build_slip_response(slip)
+        urls = {media.media_id: media.download_url for media in default.media}
+        tile_urls = {media.media_id: media.download_url for media in tiles.media}
+        ok &= check("default serves the original", "/image/3f2b9c1e-photo.jpg?" in urls[photo_id])
+        ok &= check("media_width=200 serves the 200w rendition", "/image/3f2b9c1e-photo_w200.webp?" in tile_urls[photo_id])
+        ok &= check("audio URL unchanged", "/audio/clip.m4a?" in tile_urls[audio_id])
+
+    print("\n5. Small and undecodable images...")
+    with Session(engine) as session:
+        store.write_file("image/tiny.jpg", make_photo(120, 80), "image/jpeg")
+        store.write_file("image/vector.svg", b"<svg xmlns='http://www.w3.org/2000/svg'/>", "image/svg+xml")
+        tiny = Media(slip_id=slip_id, media_type="image", storage_url="image/tiny.jpg")
+        vector = Media(slip_id=slip_id, media_type="image", storage_url="image/vector.svg")
+        session.add_all([tiny, vector])
+        session.commit()
+        tiny_id, vector_id = tiny.media_id, vector.media_id
+    ok &= check("smaller than every width -> none, no upscaling", generate_renditions(tiny_id, store=store, db_engine=engine) == [])
+    ok &= check("SVG -> none recorded, original served", generate_renditions(vector_id, store=store, db_engine=engine) == [])
+
+    print("\n6. Deleting media...")
+    media_service.storage_service = store
+    with Session(engine) as session:
+        media_service.MediaService(session).delete_media(photo_id, user_id)
+    ok &= check("original deleted", not store.exists(original_key))
+    ok &= check("every rendition deleted", not any(store.exists(r["key"]) for r in renditions or []))
+
+    print("\n7. Validating settings...")
+    formats = settings.MEDIA_RENDITION_FORMATS
+    try:
+        settings.MEDIA_RENDITION_FORMATS = ["webp", "avif"]
+        validate_rendition_settings()
+        rejected = False
+    except ValueError as e:
+        rejected = "avif" in str(e)
+    finally:
+        settings.MEDIA_RENDITION_FORMATS = formats
+    ok &= check("unknown format rejected at startup", rejected)
+    validate_rendition_settings()
+    ok &= check("default settings accepted", True)
+
+    print("\n" + "="*60)
+    if ok:
+        print("✅ All checks passed")
+    else:
+        print("❌ Some checks failed")
+        sys.exit(1)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Load test: blocking DB work on the event loop vs on the DB-sized worker pool
+
+Sends a paced stream of requests through httpx's ASGI transport, one in
+`slow_every` hitting a query that sleeps in the database, and prints
+latency of the fast requests for three setups:
+
+  - async def endpoints calling the sync session (blocks the event loop)
+  - def endpoints on AnyIO's default 40 worker threads
+  - def endpoints on WORKER_THREADS (DB_POOL_SIZE + DB_MAX_OVERFLOW) threads
+
+The database is SQLite with a sleep() function standing in for a slow
+MySQL query, behind the same instrumented pool the app uses, so pool
+waits and timeouts are reported too.
+
+    python test_worker_threads.py                   # 400 requests, 1 in 20 slow
+    python test_worker_threads.py 100 2 1500        # saturate the DB pool (~2 min)
+
+The second form holds more slow queries than the pool has connections:
+40 threads then time out waiting for a connection, WORKER_THREADS threads
+queue in the limiter instead.
+"""
+import sys
+sys.path.insert(0, '.')
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import anyio.to_thread
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event, text
+from sqlmodel import Session, create_engine
+
+from src.cores.config import settings
+from src.cores.database import InstrumentedQueuePool, WORKER_THREADS
+
+
+ARRIVAL_INTERVAL = 0.005  # seconds between requests
+POOL_TIMEOUT = 2  # seconds; short so an undersized setup shows up as errors
+
+
+def make_engine(path: str):
+    """SQLite behind the app's pool settings, with sleep(ms) for slow queries"""
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+    )
+
+    @event.listens_for(engine, "connect")
+    def register_sleep(dbapi_connection, _):
+        dbapi_connection.create_function("sleep", 1, lambda ms: time.sleep(ms / 1000) or 0)
+
+    return engine
+
+
+def make_app(engine, blocking: bool, slow_ms: int) -> FastAPI:
+    """/fast and /slow endpoints, async def (blocking) or def (worker threads)"""
+    app = FastAPI()
+
+    def query(sql: str):
+        with Session(engine) as session:
+            return session.exec(text(sql)).one()[0]
+
+    if blocking:
+        @app.get("/fast")
+        async def fast():
+            return {"value": query("SELECT 1")}
+
+        @app.get("/slow")
+        async def slow():
+            return {"value": query(f"SELECT sleep({slow_ms})")}
+    else:
+        @app.get("/fast")
+        def fast():
+            return {"value": query("SELECT 1")}
+
+        @app.get("/slow")
+        def slow():
+            return {"value": query(f"SELECT sleep({slow_ms})")}
+
+    return app
+
+
+async def run_load(app: FastAPI, threads: int, requests: int, slow_every: int) -> dict:
+    """Paced requests; returns fast-request latency percentiles (ms) and error count"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = threads
+    fast_latencies, errors = [], 0
+
+    async def send(client: httpx.AsyncClient, path: str, start: float):
+        nonlocal errors
+        try:
+            response = await client.get(path)
+            response.raise_for_status()
+        except Exception:
+            errors += 1
+            return
+        if path == "/fast":
+            fast_latencies.append((time.perf_counter() - start) * 1000)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+        # Latency counts from each request's scheduled send time, so time
+        # spent waiting for a blocked event loop to start it is included
+        tasks, begin = [], time.perf_counter()
+        for i in range(requests):
+            scheduled = begin + i * ARRIVAL_INTERVAL
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            path = "/slow" if i % slow_every == 0 else "/fast"
+            tasks.append(asyncio.create_task(send(client, path, scheduled)))
+        await asyncio.gather(*tasks)
+
+    fast_latencies.sort()
+    return {
+        "p50_ms": statistics.median(fast_latencies) if fast_latencies else 0.0,
+        "p99_ms": fast_latencies[int(len(fast_latencies) * 0.99)] if fast_latencies else 0.0,
+        "errors": errors,
+    }
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    slow_every = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    slow_ms = int(sys.argv[3]) if len(sys.argv) > 3 else 250
+
+    print("="*60)
+    print(f"Worker Thread Load Test ({requests} requests, 1 in {slow_every} sleeps {slow_ms} ms)")
+    print(f"DB pool: {settings.DB_POOL_SIZE} + {settings.DB_MAX_OVERFLOW} overflow, "
+          f"WORKER_THREADS={WORKER_THREADS}")
+    print("="*60)
+
+    tmp = tempfile.mkdtemp()
+    setups = [
+        ("async def on the event loop", True, WORKER_THREADS),
+        ("def, 40 default threads", False, 40),
+        (f"def, {WORKER_THREADS} threads (WORKER_THREADS)", False, WORKER_THREADS),
+    ]
+
+    results = {}
+    for label, blocking, threads in setups:
+        engine = make_engine(os.path.join(tmp, f"{len(results)}.db"))
+        stats = asyncio.run(run_load(make_app(engine, blocking, slow_ms), threads, requests, slow_every))
+        pool = engine.pool.stats()
+        results[label] = stats
+        print(f"\n   {label}")
+        print(f"      fast requests: p50 {stats['p50_ms']:7.1f} ms, p99 {stats['p99_ms']:7.1f} ms, errors {stats['errors']}")
+        print(f"      pool: {pool['checkouts']} checkouts, wait avg {pool['wait_avg_ms']:.1f} ms, "
+              f"max {pool['wait_max_ms']:.1f} ms, timeouts {pool['timeouts']}")
+        engine.dispose()
+
+    blocked, sized = results[setups[0][0]], results[setups[2][0]]
+    ok = sized["errors"] == 0 and sized["p99_ms"] < blocked["p99_ms"]
+    print("\n" + "="*60)
+    if ok:
+        print("✅ Sized worker pool keeps fast requests off the slow ones' queue, with no pool errors")
+    else:
+        print("❌ Sized worker pool did not beat the blocking setup")
+        sys.exit(1)